@@ -1,37 +1,392 @@
 import os
 import sqlite3
+import argparse
+import numpy as np
 
-# Get the database path from an environment variable
-db_directory = os.getenv("GAME_OF_LIFE_DB")
-if not db_directory:
-    raise ValueError("Environment variable GAME_OF_LIFE_DB is not set.")
+# Version stored in PRAGMA user_version. Version 1 is the original flat
+# generations table (which predates user_version, so it reads as 0).
+SCHEMA_VERSION = 6
 
-# Construct the full path to the database file
-db_path = os.path.join(db_directory, "game_of_life.db")
+# Columns of a flat record, in the order of the CSV files and the
+# original generations table
+FLAT_COLUMNS = (
+    'run_id', 'grid_size', 'probability_of_life', 'total_generations',
+    'generation', 'alive_cells', 'dead_cells', 'born_cells', 'died_cells',
+    'stability_index', 'density'
+)
 
-# Connect to the SQLite database (or create it if it doesn't exist)
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
+# Per-generation statistics stored in the generations table
+STAT_COLUMNS = (
+    'alive_cells', 'dead_cells', 'born_cells', 'died_cells',
+    'stability_index', 'density'
+)
 
-# Create a table to store the data
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS generations (
-    run_id TEXT,
-    grid_size TEXT,
+# Seconds spent per phase of a profiled run (see run_simulation's profile)
+TIMING_COLUMNS = (
+    'step_seconds', 'stats_seconds', 'cycles_seconds', 'logging_seconds', 'io_seconds',
+    'census_seconds'
+)
+
+# Objects found in the final grid (see census.census)
+CENSUS_COLUMNS = ('still_lifes', 'oscillators', 'spaceships', 'other_objects')
+
+# Per-run columns of the runs table that records may carry
+RUN_COLUMNS = (
+    'rows', 'cols', 'probability_of_life', 'total_generations', 'seed',
+    'start_time', 'end_time', 'duration', 'period', 'stabilization_generation', 'rule'
+) + TIMING_COLUMNS + CENSUS_COLUMNS
+
+# runs columns added after schema v2, which older databases may lack
+ADDED_RUN_COLUMNS = {
+    'rule': 'TEXT',
+    **{column: 'REAL' for column in TIMING_COLUMNS},
+    **{column: 'INTEGER' for column in CENSUS_COLUMNS},
+}
+
+# Densities (in percent) are summarized in this many equal-width bins
+DENSITY_BINS = 1000
+
+
+def density_bin(density):
+    """SQL expression for the density_summary bin of a density expression."""
+    return f"MIN(CAST({density} * {DENSITY_BINS} / 100.0 AS INTEGER), {DENSITY_BINS - 1})"
+
+
+def _summary_upsert(sign, run, generation, source):
+    """Trigger statement adding (sign '') or removing (sign '-') generation
+    rows from density_summary. run and generation name the runs and
+    generations rows involved; one of them is NEW or OLD."""
+    return f"""
+        INSERT INTO density_summary (probability_of_life, rows, cols, generation, bin,
+                                     runs, density_sum, density_sq_sum)
+        SELECT {run}.probability_of_life, {run}.rows, {run}.cols, {generation}.generation,
+               {density_bin(f"{generation}.density")}, {sign}1, {sign}{generation}.density,
+               {sign}{generation}.density * {generation}.density
+        FROM {source}
+        WHERE {run}.run_id = {generation}.run_id AND {generation}.density IS NOT NULL
+          AND {run}.probability_of_life IS NOT NULL
+          AND {run}.rows IS NOT NULL AND {run}.cols IS NOT NULL
+        ON CONFLICT (probability_of_life, rows, cols, generation, bin) DO UPDATE SET
+            runs = runs + excluded.runs,
+            density_sum = density_sum + excluded.density_sum,
+            density_sq_sum = density_sq_sum + excluded.density_sq_sum;"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    rows INTEGER,
+    cols INTEGER,
     probability_of_life REAL,
     total_generations INTEGER,
-    generation INTEGER,
+    seed INTEGER,
+    start_time TEXT,
+    end_time TEXT,
+    duration REAL,
+    period INTEGER,
+    stabilization_generation INTEGER,
+    rule TEXT,
+    step_seconds REAL,
+    stats_seconds REAL,
+    cycles_seconds REAL,
+    logging_seconds REAL,
+    io_seconds REAL,
+    census_seconds REAL,
+    still_lifes INTEGER,
+    oscillators INTEGER,
+    spaceships INTEGER,
+    other_objects INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS generations (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    generation INTEGER NOT NULL,
     alive_cells INTEGER,
     dead_cells INTEGER,
     born_cells INTEGER,
     died_cells INTEGER,
     stability_index REAL,
-    density REAL
-)
-""")
+    density REAL,
+    PRIMARY KEY (run_id, generation)
+) WITHOUT ROWID;
+
+-- Runs by probability (and grid size) without touching the table
+CREATE INDEX IF NOT EXISTS idx_runs_probability
+    ON runs (probability_of_life, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_size
+    ON runs (rows, cols, probability_of_life, run_id);
+
+-- Density at a given generation (e.g. final density) across runs
+CREATE INDEX IF NOT EXISTS idx_generations_generation
+    ON generations (generation, run_id, density);
+
+-- Density histogram per (probability, grid size, generation), kept up to
+-- date by the triggers below. A group's count, mean and variance come
+-- from summing its bins; bins whose runs dropped to 0 are left in place.
+CREATE TABLE IF NOT EXISTS density_summary (
+    probability_of_life REAL NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    generation INTEGER NOT NULL,
+    bin INTEGER NOT NULL,
+    runs INTEGER NOT NULL,
+    density_sum REAL NOT NULL,
+    density_sq_sum REAL NOT NULL,
+    PRIMARY KEY (probability_of_life, rows, cols, generation, bin)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_density_summary_generation
+    ON density_summary (generation);
+""" + f"""
+CREATE TRIGGER IF NOT EXISTS summary_generation_insert
+AFTER INSERT ON generations BEGIN
+    {_summary_upsert("", "r", "NEW", "runs r")}
+END;
+CREATE TRIGGER IF NOT EXISTS summary_generation_delete
+AFTER DELETE ON generations BEGIN
+    {_summary_upsert("-", "r", "OLD", "runs r")}
+END;
+CREATE TRIGGER IF NOT EXISTS summary_generation_update
+AFTER UPDATE OF run_id, generation, density ON generations BEGIN
+    {_summary_upsert("-", "r", "OLD", "runs r")}
+    {_summary_upsert("", "r", "NEW", "runs r")}
+END;
+
+-- A run's probability or size can be filled in after its generations
+CREATE TRIGGER IF NOT EXISTS summary_run_update
+AFTER UPDATE OF probability_of_life, rows, cols ON runs
+WHEN OLD.probability_of_life IS NOT NEW.probability_of_life
+  OR OLD.rows IS NOT NEW.rows OR OLD.cols IS NOT NEW.cols BEGIN
+    {_summary_upsert("-", "OLD", "g", "generations g")}
+    {_summary_upsert("", "NEW", "g", "generations g")}
+END;
+CREATE TRIGGER IF NOT EXISTS summary_run_delete
+AFTER DELETE ON runs BEGIN
+    {_summary_upsert("-", "OLD", "g", "generations g")}
+END;
+"""
+
+
+def get_db_path():
+    """Path of the SQLite database, from the GAME_OF_LIFE_DB environment variable."""
+    # Get the database path from an environment variable
+    db_directory = os.getenv("GAME_OF_LIFE_DB")
+    if not db_directory:
+        raise ValueError("Environment variable GAME_OF_LIFE_DB is not set.")
+
+    # Construct the full path to the database file
+    return os.path.join(db_directory, "game_of_life.db")
+
+
+def get_schema_version(conn):
+    """Schema version of an open database (0 for a new, empty one)."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0 and _table_exists(conn, "generations"):
+        return 1
+    return version
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def create_tables(conn):
+    """Bring the database up to the current schema.
+
+    New databases get the current schema directly; older ones are
+    migrated in place (see migrate).
+    """
+    if get_schema_version(conn) < SCHEMA_VERSION:
+        if _table_exists(conn, "generations"):
+            migrate(conn)
+            return
+        with conn:
+            _create_schema(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def migrate(conn, chunk_rows=100000):
+    """Convert an existing database to the current schema in place.
+
+    Version 1 -> 2: the flat generations table is split into runs and
+    generations. grid_size strings become integer rows/cols, and the
+    metadata-only rows written by the visualizer (NULL generation) become
+    run records. Its stats rows, which leave run_id empty, are attributed
+    to the run on the preceding metadata row. Duplicate (run_id,
+    generation) rows keep the last one imported.
+
+    Version 2 -> 3: adds the density_summary table and its triggers,
+    filled from the existing rows.
+
+    Version 3 -> 4: adds the per-phase timing columns to runs.
+
+    Version 4 -> 5: adds census_seconds and the census columns to runs.
+
+    Version 5 -> 6: adds the rule column to runs (NULL, i.e. B3/S23, for
+    existing runs).
+
+    The whole migration runs in one transaction.
+    """
+    version = get_schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN")
+    try:
+        if version == 1:
+            conn.execute("ALTER TABLE generations RENAME TO generations_v1")
+            _create_schema(conn)
+            old_rows = conn.execute(
+                f"SELECT {', '.join(FLAT_COLUMNS)} FROM generations_v1 ORDER BY rowid"
+            )
+            run_id = None
+            while True:
+                chunk = old_rows.fetchmany(chunk_rows)
+                if not chunk:
+                    break
+                # Carry the current run across chunks for unattributed rows
+                run_id = insert_records(
+                    conn, (dict(zip(FLAT_COLUMNS, row)) for row in chunk), run_id
+                )
+            conn.execute("DROP TABLE generations_v1")
+        else:
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            for column, column_type in ADDED_RUN_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+            _create_schema(conn)
+            if version < 3:
+                rebuild_summary(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _create_schema(conn):
+    """Create the current tables and indexes inside the open transaction.
+
+    (executescript would commit first, so statements are run one by one.)
+    """
+    statement = ""
+    for part in SCHEMA.split(";"):
+        statement += part + ";"
+        # Trigger bodies contain ';' too, so wait for a complete statement
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+
+
+def rebuild_summary(conn):
+    """Recompute density_summary from the runs and generations tables.
+
+    Only needed after changing rows with the triggers disabled or
+    missing; does not commit.
+    """
+    conn.execute("DELETE FROM density_summary")
+    conn.execute(f"""
+        INSERT INTO density_summary
+        SELECT r.probability_of_life, r.rows, r.cols, g.generation,
+               {density_bin("g.density")} AS bin,
+               COUNT(*), SUM(g.density), SUM(g.density * g.density)
+        FROM runs r JOIN generations g USING (run_id)
+        WHERE g.density IS NOT NULL AND r.probability_of_life IS NOT NULL
+          AND r.rows IS NOT NULL AND r.cols IS NOT NULL
+        GROUP BY r.probability_of_life, r.rows, r.cols, g.generation, bin
+    """)
+
+
+def parse_grid_size(grid_size):
+    """Split a 'ROWSxCOLS' string into integers (None if it can't be parsed)."""
+    try:
+        rows, cols = str(grid_size).lower().split("x")
+        return int(rows), int(cols)
+    except (AttributeError, ValueError):
+        return None, None
+
+
+def insert_records(conn, records, run_id=None):
+    """Insert flat records into the runs and generations tables.
+
+    Records are dicts keyed like run_simulation's output (FLAT_COLUMNS,
+    plus any RUN_COLUMNS such as 'period'); NumPy scalars are converted
+    to plain Python values. Empty values should already be None. A
+    record without a run_id belongs to the previous record's run (the
+    visualizer only fills it on its metadata row); a record without a
+    generation only describes its run. Existing runs keep any values the
+    new records leave empty. Does not commit.
+
+    Args:
+        run_id (str): Run for leading records that have none
+
+    Returns:
+        str: run_id of the last record, to continue attribution
+    """
+    runs = {}
+    generation_rows = []
+    for record in records:
+        run_id = record.get('run_id') or run_id
+        if run_id is None:
+            continue
+        run = runs.setdefault(run_id, {})
+        if record.get('grid_size') is not None:
+            run['rows'], run['cols'] = parse_grid_size(record['grid_size'])
+        for column in RUN_COLUMNS:
+            if record.get(column) is not None:
+                run[column] = to_builtin(record[column])
+        if record.get('generation') is not None:
+            generation_rows.append(
+                (run_id, to_builtin(record['generation']))
+                + tuple(to_builtin(record.get(c)) for c in STAT_COLUMNS)
+            )
+
+    updates = ", ".join(f"{c} = COALESCE(excluded.{c}, runs.{c})" for c in RUN_COLUMNS)
+    conn.executemany(
+        f"""INSERT INTO runs (run_id, {', '.join(RUN_COLUMNS)})
+            VALUES ({', '.join('?' * (len(RUN_COLUMNS) + 1))})
+            ON CONFLICT (run_id) DO UPDATE SET {updates}""",
+        [(rid,) + tuple(run.get(c) for c in RUN_COLUMNS) for rid, run in runs.items()]
+    )
+    # An upsert rather than INSERT OR REPLACE, so that the summary
+    # triggers see replaced rows as updates
+    stat_updates = ", ".join(f"{c} = excluded.{c}" for c in STAT_COLUMNS)
+    conn.executemany(
+        f"""INSERT INTO generations (run_id, generation, {', '.join(STAT_COLUMNS)})
+            VALUES ({', '.join('?' * (len(STAT_COLUMNS) + 2))})
+            ON CONFLICT (run_id, generation) DO UPDATE SET {stat_updates}""",
+        generation_rows
+    )
+    return run_id
+
+
+def to_builtin(value):
+    """Convert NumPy scalars and arrays to plain Python values (for sqlite3 and JSON)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or migrate the Game of Life database.")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Reclaim space after migrating an existing database")
+    args = parser.parse_args()
+
+    db_path = get_db_path()
 
-# Commit the changes and close the connection
-conn.commit()
-conn.close()
+    # Connect to the SQLite database (or create it if it doesn't exist)
+    conn = sqlite3.connect(db_path)
+    old_version = get_schema_version(conn)
+    create_tables(conn)
+    if args.vacuum and old_version != get_schema_version(conn):
+        conn.execute("VACUUM")
+    conn.close()
 
-print(f"Database created/updated at: {db_path}")
\ No newline at end of file
+    if old_version and old_version < SCHEMA_VERSION:
+        print(f"Migrated database from schema v{old_version} to v{SCHEMA_VERSION}: {db_path}")
+    else:
+        print(f"Database created/updated at: {db_path}")
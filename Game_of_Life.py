@@ -1,9 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import csv
-from datetime import datetime
-from game_of_life_core import get_prob_of_life
+from game_of_life_core import get_prob_of_life, initialize_grid, new_run_id
+from seeding import new_seed
+from render import FrameProducer, export, play
 
 # Probability of life
 probability_of_life = get_prob_of_life()
@@ -11,15 +10,23 @@ probability_of_life = get_prob_of_life()
 # Grid size
 rows, cols = 100, 150
 
-# Initialize the grid with random states
-grid = np.random.choice([0, 1], size=(rows, cols), p=[1 - probability_of_life, probability_of_life])
+# Initialize the grid with random states; the seed regenerates it later
+seed = new_seed()
+grid = initialize_grid(rows, cols, probability_of_life, seed)
+print(f"Seed: {seed}")
 
-# Create a unique Run ID (e.g., timestamp)
-run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+# Create a unique Run ID (timestamp plus a random suffix)
+run_id = new_run_id()
 
 # Total generations to simulate
 total_generations = 1750
 
+# Draw every k-th generation (all generations are still simulated and logged)
+render_every = 1
+
+# Set to e.g. "game_of_life.gif" or "game_of_life.mp4" to render without a window
+output_file = None
+
 # Open a .csv file to save the data
 csv_filename = f"game_of_life_{run_id}.csv"
 with open(csv_filename, mode="w", newline="") as file:
@@ -29,32 +36,19 @@ with open(csv_filename, mode="w", newline="") as file:
     writer.writerow([
         "Run ID", "Grid Size", "Probability of Life", "Total Generations",
         "Generation", "Alive Cells", "Dead Cells", "Born Cells", "Died Cells",
-        "Stability Index", "Density"
+        "Stability Index", "Density", "seed"
     ])
     
     # Write metadata (static for the entire run)
     writer.writerow([
         run_id, f"{rows}x{cols}", probability_of_life, total_generations,
-        "", "", "", "", "", "", ""
+        "", "", "", "", "", "", "", seed
     ])
 
-    # Function to update the grid for each generation
-    def update(frame_num, img, grid, rows, cols, text):
+    # Log statistics for each generation (runs in the simulation thread)
+    def log_generation(frame_num, grid, new_grid):
         global previous_grid  # Store the previous grid for calculations
 
-        # Stop the animation after total_generations
-        if frame_num >= total_generations:
-            ani.event_source.stop()  # Stop the animation
-            
-            # Write final conditions to the .csv file
-            alive_cells = np.sum(grid)
-            dead_cells = grid.size - alive_cells
-            writer.writerow([
-                run_id, f"{rows}x{cols}", probability_of_life, total_generations,
-                frame_num, alive_cells, dead_cells, "", "", "", ""
-            ])
-            return img, text
-
         # Log statistics every 100 generations (skip initialization call)
         if frame_num % 100 == 0 and frame_num != 0:  # Skip frame_num = 0
             alive_cells = np.sum(grid)  # Count alive cells (1s)
@@ -82,54 +76,32 @@ with open(csv_filename, mode="w", newline="") as file:
             writer.writerow([
                 run_id, f"{rows}x{cols}", probability_of_life, total_generations,
                 frame_num, alive_cells, dead_cells, born_cells, died_cells,
-                stability_index, density
+                stability_index, density, seed
             ])
 
         # Update the previous grid
-        previous_grid = grid.copy()
-
-        new_grid = grid.copy()
-        for i in range(rows):
-            for j in range(cols):
-                # Count the number of live neighbors
-                neighbors = (
-                    grid[(i - 1) % rows, (j - 1) % cols]
-                    + grid[(i - 1) % rows, j]
-                    + grid[(i - 1) % rows, (j + 1) % cols]
-                    + grid[i, (j - 1) % cols]
-                    + grid[i, (j + 1) % cols]
-                    + grid[(i + 1) % rows, (j - 1) % cols]
-                    + grid[(i + 1) % rows, j]
-                    + grid[(i + 1) % rows, (j + 1) % cols]
-                )
-                # Apply the rules of the Game of Life
-                if grid[i, j] == 1:
-                    if neighbors < 2 or neighbors > 3:
-                        new_grid[i, j] = 0
-                else:
-                    if neighbors == 3:
-                        new_grid[i, j] = 1
-        img.set_data(new_grid)
-        grid[:] = new_grid[:]
-
-        # Update the generation number
-        text.set_text(f"Generation: {frame_num}")
-        return img, text
-
-    # Set up the animation
-    fig, ax = plt.subplots()
-    img = ax.imshow(grid, interpolation="nearest", cmap="binary")
-
-    # Add a text annotation for the generation number
-    text = ax.text(0.02, 0.95, "", transform=ax.transAxes, color="red", fontsize=12)
+        previous_grid = grid
+
+        # Write final conditions to the .csv file after the last generation
+        if frame_num == total_generations - 1:
+            alive_cells = np.sum(new_grid)
+            dead_cells = new_grid.size - alive_cells
+            writer.writerow([
+                run_id, f"{rows}x{cols}", probability_of_life, total_generations,
+                total_generations, alive_cells, dead_cells, "", "", "", "", seed
+            ])
 
     # Initialize the previous grid
     previous_grid = grid.copy()
 
-    # Create the animation
-    ani = animation.FuncAnimation(
-        fig, update, fargs=(img, grid, rows, cols, text), frames=total_generations, interval=50, repeat=False
-    )
-
-    # Display the animation
-    plt.show()
\ No newline at end of file
+    # Step the grid in a background thread, drawing every render_every-th generation
+    producer = FrameProducer(grid, total_generations, every=render_every,
+                             on_generation=log_generation)
+
+    if output_file:
+        # Headless: encode the animation without opening a window
+        export(producer, output_file)
+        print(f"Saved animation to {output_file}")
+    else:
+        # Display the animation
+        play(producer, interval=50)
@@ -1,46 +1,173 @@
 import sqlite3
+import argparse
 import matplotlib.pyplot as plt
 import numpy as np
-import os
+from DataBase import DENSITY_BINS, create_tables, density_bin, get_db_path
+from rules import CONWAY, get_rule
 
 
 def get_db_connection():
-    """Reusable database connection setup"""
-    db_directory = os.getenv("GAME_OF_LIFE_DB")
-    if not db_directory:
-        raise ValueError("Environment variable GAME_OF_LIFE_DB is not set.")
-    db_path = os.path.join(db_directory, "game_of_life.db")
-    return sqlite3.connect(db_path)
+    """Reusable database connection setup (brings the schema up to date)"""
+    conn = sqlite3.connect(get_db_path())
+    create_tables(conn)
+    return conn
 
 def get_density_by_probability():
     """Returns a dictionary of {probability: [density_values]}"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Get all probabilities in the database
-        cursor.execute("SELECT DISTINCT probability_of_life FROM generations")
-        probabilities = [row[0] for row in cursor.fetchall()]
-        
-        # Get densities grouped by probability
+        # One ordered pass instead of a query per probability
+        cursor.execute(
+            """SELECT r.probability_of_life, g.density
+               FROM runs r JOIN generations g USING (run_id)
+               WHERE g.density IS NOT NULL
+               ORDER BY r.probability_of_life"""
+        )
         density_groups = {}
-        for prob in probabilities:
-            cursor.execute(
-                "SELECT density FROM generations WHERE probability_of_life = ? AND density IS NOT NULL",
-                (prob,)
-            )
-            density_groups[prob] = [row[0] for row in cursor.fetchall()]
+        for prob, density in cursor:
+            density_groups.setdefault(prob, []).append(density)
             
-        return density_groups, probabilities
+        return density_groups, list(density_groups)
+
+def get_density_histograms(bins=20, generation=None, rows=None, cols=None,
+                           quantiles=(0.25, 0.5, 0.75), raw=False):
+    """Density histogram, mean, standard deviation and quantiles per probability.
+
+    Everything is aggregated in SQLite in a single statement, from the
+    density_summary table by default. With raw=True the same statement
+    bins the generations table directly (one GROUP BY pass), which gives
+    the same counts and means but scans every row.
+
+    The histogram spans the observed densities, like plt.hist. Quantiles
+    are read off the cumulative summary bins, so they are accurate to
+    100 / DENSITY_BINS percent.
+
+    Args:
+        bins (int): Number of histogram bins
+        generation (int): Only this generation (default: all logged ones)
+        rows (int), cols (int): Only this grid size
+        quantiles (tuple): Quantiles to compute, between 0 and 1
+        raw (bool): Aggregate the raw rows instead of the summary table
+
+    Returns:
+        dict: {probability: {'counts', 'edges', 'count', 'mean', 'std',
+               'quantiles'}} with counts/edges as for np.histogram and
+               quantiles as {q: density}
+    """
+    filters = {'generation': generation, 'rows': rows, 'cols': cols}
+    conditions = [f"{name} = ?" for name, value in filters.items() if value is not None]
+    params = [value for value in filters.values() if value is not None]
+    if raw:
+        source = f"""
+            SELECT r.probability_of_life, {density_bin("g.density")} AS bin,
+                   COUNT(*) AS n, SUM(g.density) AS s, SUM(g.density * g.density) AS ss
+            FROM runs r JOIN generations g USING (run_id)
+            WHERE {" AND ".join(["g.density IS NOT NULL", "r.probability_of_life IS NOT NULL"] + conditions)}
+            GROUP BY r.probability_of_life, bin"""
+    else:
+        source = f"""
+            SELECT probability_of_life, bin,
+                   SUM(runs) AS n, SUM(density_sum) AS s, SUM(density_sq_sum) AS ss
+            FROM density_summary
+            WHERE {" AND ".join(["runs > 0"] + conditions)}
+            GROUP BY probability_of_life, bin"""
+    quantile_values = ", ".join("(?)" for _ in quantiles) or "(NULL)"
+
+    query = f"""
+        WITH fine AS MATERIALIZED ({source}),
+        bounds AS (SELECT MIN(bin) AS lo, MAX(bin) - MIN(bin) + 1 AS span FROM fine),
+        cumulative AS (
+            SELECT probability_of_life, bin,
+                   SUM(n) OVER (PARTITION BY probability_of_life ORDER BY bin) AS below,
+                   SUM(n) OVER (PARTITION BY probability_of_life) AS total
+            FROM fine
+        ),
+        q(value) AS (VALUES {quantile_values})
+        -- Histogram: regroup the fine bins into `bins` bins over [lo, lo + span)
+        SELECT 'bin', probability_of_life, (bin - lo) * ? / span AS k,
+               SUM(n), SUM(s), SUM(ss), lo, span
+        FROM fine, bounds
+        GROUP BY probability_of_life, k
+        UNION ALL
+        -- Quantiles: first fine bin whose cumulative count reaches q
+        SELECT 'quantile', probability_of_life, q.value, MIN(bin), NULL, NULL, NULL, NULL
+        FROM cumulative, q
+        WHERE below >= q.value * total
+        GROUP BY probability_of_life, q.value
+    """
+    with get_db_connection() as conn:
+        result = conn.execute(query, params + list(quantiles) + [bins]).fetchall()
 
-def plot_comparison_histogram(density_groups):
+    width = 100.0 / DENSITY_BINS
+    histograms = {}
+    for kind, prob, key, n, s, ss, lo, span in result:
+        entry = histograms.setdefault(prob, {
+            'counts': np.zeros(bins, dtype=np.int64), 'count': 0,
+            'mean': 0.0, 'std': 0.0, 'quantiles': {},
+        })
+        if kind == 'quantile':
+            entry['quantiles'][key] = (n + 0.5) * width  # bin center
+            continue
+        entry['counts'][key] = n
+        entry['count'] += n
+        entry['mean'] += s
+        entry['std'] += ss
+        entry['edges'] = (lo + np.arange(bins + 1) * span / bins) * width
+
+    for entry in histograms.values():
+        mean = entry['mean'] / entry['count']
+        entry['std'] = np.sqrt(max(entry['std'] / entry['count'] - mean * mean, 0.0))
+        entry['mean'] = mean
+    return histograms
+
+def get_final_density_stats(rule=None):
+    """Count, mean and sample standard deviation of each run's final density.
+
+    A run's final density is its density at generation total_generations,
+    so runs that were interrupted (or didn't log their last generation)
+    are left out. Runs are grouped by configuration.
+
+    Args:
+        rule (str): Only runs of this life-like rule (default B3/S23,
+            which includes runs recorded without a rule)
+
+    Returns:
+        dict: {(probability, rows, cols, total_generations):
+               {'count', 'mean', 'std'}}, with std None for a single run
+    """
+    with get_db_connection() as conn:
+        result = conn.execute(
+            """SELECT r.probability_of_life, r.rows, r.cols, r.total_generations,
+                      COUNT(*), AVG(g.density), SUM(g.density * g.density)
+               FROM runs r
+               JOIN generations g
+                 ON g.run_id = r.run_id AND g.generation = r.total_generations
+               WHERE g.density IS NOT NULL AND r.probability_of_life IS NOT NULL
+                 AND COALESCE(r.rule, ?) = ?
+               GROUP BY r.probability_of_life, r.rows, r.cols, r.total_generations""",
+            (CONWAY, get_rule(rule).rulestring)
+        ).fetchall()
+
+    stats = {}
+    for prob, rows, cols, generations, n, mean, ss in result:
+        std = np.sqrt(max(ss - n * mean * mean, 0.0) / (n - 1)) if n > 1 else None
+        stats[prob, rows, cols, generations] = {'count': n, 'mean': mean, 'std': std}
+    return stats
+
+def plot_comparison_histogram(histograms):
+    """Plot the histograms returned by get_density_histograms."""
     plt.figure(figsize=(12, 6))
     
     # Plot histograms for each probability group
     colors = ['skyblue', 'salmon', 'lightgreen']  # Different colors for each group
-    for i, (prob, densities) in enumerate(density_groups.items()):
-        plt.hist(
-            densities,
-            bins=20,
+    for i, (prob, histogram) in enumerate(histograms.items()):
+        edges = histogram['edges']
+        plt.bar(
+            edges[:-1],
+            histogram['counts'],
+            width=np.diff(edges),
+            align='edge',
             alpha=0.6,
             color=colors[i % len(colors)],
             edgecolor='black',
@@ -54,10 +181,10 @@ def plot_comparison_histogram(density_groups):
     plt.grid(axis='y', alpha=0.3)
     
     # Add mean markers
-    for prob, densities in density_groups.items():
+    for prob, histogram in histograms.items():
         plt.axvline(
-            x=np.mean(densities),
-            color=colors[list(density_groups.keys()).index(prob) % len(colors)],
+            x=histogram['mean'],
+            color=colors[list(histograms.keys()).index(prob) % len(colors)],
             linestyle='--',
             linewidth=1
         )
@@ -67,6 +194,16 @@ def plot_comparison_histogram(density_groups):
     plt.show()
 
 if __name__ == "__main__":
-    density_groups, proabilities = get_density_by_probability()
-    print(proabilities)
-    plot_comparison_histogram(density_groups)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Plot density histograms by probability of life.")
+    parser.add_argument("--bins", type=int, default=20)
+    parser.add_argument("--generation", type=int, help="Only this generation")
+    parser.add_argument("--raw", action="store_true",
+                        help="Aggregate raw rows instead of the summary table")
+    args = parser.parse_args()
+
+    histograms = get_density_histograms(args.bins, args.generation, raw=args.raw)
+    for prob, histogram in histograms.items():
+        quartiles = ", ".join(f"{q:g}: {value:.2f}" for q, value in histogram['quantiles'].items())
+        print(f"{prob}: n={histogram['count']} mean={histogram['mean']:.2f} "
+              f"std={histogram['std']:.2f} quantiles({quartiles})")
+    plot_comparison_histogram(histograms)
\ No newline at end of file
@@ -1,23 +1,248 @@
-from game_of_life_core import run_simulation, save_to_csv, get_prob_of_life, get_num_runs
-from datetime import datetime
+from game_of_life_core import run_simulation, save_to_csv, get_prob_of_life, get_num_runs, new_run_id
+from bitgrid import run_packed_simulation
+from ensemble import run_ensemble_simulation
+from sinks import ColumnarSink, SQLiteSink
+from profiling import profiling, sampling_profiler
+from census import DEFAULT_CACHE, PatternCache
+from seeding import spawn_seeds
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import argparse
 import os
 
-def run_batch_simulations(num_runs=5, prob_of_life=0.1):
-    """Run multiple simulations with consistent parameters."""
-    for _ in range(num_runs):
-        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")  # Generate once per run
-        data, _ = run_simulation(
-            run_id=run_id,
-            prob_of_life=prob_of_life  # Pass the probability parameter
-        )
+def _simulator(packed, detect_cycles, profile=False, pattern_cache=None, rule=None,
+               streaming=False):
+    """Pick the simulation function and its extra keyword arguments.
+
+    A pattern_cache turns the census on; streaming means the records go
+    to a sink.
+    """
+    if packed:
+        if rule is not None:
+            raise ValueError("The packed grid only runs B3/S23")
+        if detect_cycles or profile or pattern_cache is not None or streaming:
+            raise ValueError("The packed grid doesn't support cycle detection, profiling, "
+                             "the census or streaming to a database or columnar store")
+        return run_packed_simulation, {}
+    return run_simulation, {'detect_cycles': detect_cycles, 'profile': profile,
+                            'census': pattern_cache is not None,
+                            'pattern_cache': pattern_cache, 'rule': rule}
+
+def run_batch_simulations(num_runs=5, prob_of_life=0.1, rows=100, cols=150, packed=False,
+                          detect_cycles=False, to_db=False, columnar=None, profile=False,
+                          census=False, pattern_cache=None, rule=None, seed=None):
+    """Run multiple simulations with consistent parameters.
+
+    Args:
+        packed (bool): Use the bit-packed grid (1 bit per cell) for very
+                       large boards
+        detect_cycles (bool): Stop each run early once it settles into a
+                              fixed point or cycle (not with packed)
+        to_db (bool): Stream records straight into the SQLite database
+                      instead of writing CSV files (not with packed)
+        columnar (str): Append records to this columnar store directory
+                        instead of writing CSV files (not with packed)
+        profile (bool): Record per-phase timings with every run and print
+                        the batch totals (not with packed)
+        census (bool): Count still lifes, oscillators and spaceships in
+                       each final grid (not with packed)
+        pattern_cache (str): JSON file of already classified patterns,
+                             read before and updated after the batch
+        rule (str): Life-like rule, e.g. 'B36/S23' (not with packed)
+        seed (int): Root seed for the batch; None draws fresh entropy.
+                    Each run gets its own seed spawned from it.
+    """
+    cache = PatternCache(pattern_cache) if census else None
+    simulate, options = _simulator(packed, detect_cycles, profile, cache, rule,
+                                   streaming=to_db or bool(columnar))
+    if to_db:
+        sink = SQLiteSink()
+    elif columnar:
+        sink = ColumnarSink(columnar)
+    else:
+        sink = None
+    try:
+        with profiling() if profile else nullcontext() as timer:
+            for run_seed in spawn_seeds(seed, num_runs):
+                run_id = new_run_id()  # Generate once per run
+                if sink is not None:
+                    simulate(rows=rows, cols=cols, run_id=run_id, prob_of_life=prob_of_life,
+                             seed=run_seed, sink=sink, **options)
+                    print(f"Streamed simulation {run_id} to: {columnar or sink.db_path}")
+                    continue
+                data, _ = simulate(
+                    rows=rows,
+                    cols=cols,
+                    run_id=run_id,
+                    prob_of_life=prob_of_life,  # Pass the probability parameter
+                    seed=run_seed,
+                    **options
+                )
+                csv_path = save_to_csv(data, run_id=run_id)
+                print(f"Saved simulation to: {csv_path}")  # Feedback for user
+        if timer is not None:
+            print(timer.summary())
+    finally:
+        if sink is not None:
+            sink.close()
+        if cache is not None:
+            cache.save()
+
+def run_ensemble_batch(num_runs=5, prob_of_life=0.1, rows=100, cols=150, seed=None):
+    """Run a batch as one stacked ensemble and save each run's CSV.
+
+    Best for many runs of a small board, where per-call overhead
+    dominates a run-at-a-time loop. With the same seed the runs match
+    those of run_batch_simulations.
+    """
+    paths = []
+    for data, run_id in run_ensemble_simulation(num_runs, rows, cols, prob_of_life,
+                                                seeds=spawn_seeds(seed, num_runs)):
         csv_path = save_to_csv(data, run_id=run_id)
-        print(f"Saved simulation to: {csv_path}")  # Feedback for user
-    
+        print(f"Saved simulation to: {csv_path}")
+        paths.append(csv_path)
+    return paths
+
+def _run_one(job):
+    """Worker entry point: run and save a single simulation.
+
+    Each job carries its own seed, spawned from the batch's root, so
+    every run draws its grid from an independent stream.
+    """
+    (run_id, seed, rows, cols, prob_of_life, packed, detect_cycles, to_db, profile,
+     census, rule) = job
+    # Each worker keeps its own in-memory cache across the jobs it runs
+    simulate, options = _simulator(packed, detect_cycles, profile,
+                                   DEFAULT_CACHE if census else None, rule, streaming=to_db)
+    if to_db:
+        with SQLiteSink() as sink:
+            simulate(rows=rows, cols=cols, run_id=run_id, prob_of_life=prob_of_life,
+                     seed=seed, sink=sink, **options)
+        return run_id, sink.db_path
+    data, _ = simulate(rows=rows, cols=cols, run_id=run_id, prob_of_life=prob_of_life,
+                       seed=seed, **options)
+    return run_id, save_to_csv(data, run_id=run_id)
+
+def run_parallel_batch_simulations(num_runs=5, prob_of_life=0.1, rows=100, cols=150,
+                                   packed=False, workers=None, seed=None, detect_cycles=False,
+                                   to_db=False, profile=False, census=False, rule=None):
+    """Run a batch of simulations on a process pool.
+
+    Args:
+        workers (int): Number of worker processes (default: CPU count)
+        seed (int): Root seed for the batch; None draws fresh entropy.
+                    Each run gets its own child stream spawned from it.
+        profile (bool): Record per-phase timings with every run
+        census (bool): Count still lifes, oscillators and spaceships in
+                       each final grid
+        rule (str): Life-like rule, e.g. 'B36/S23' (not with packed)
+
+    Returns:
+        list: (run_id, output path) tuples in submission order
+    """
+    jobs = [
+        (new_run_id(), run_seed, rows, cols, prob_of_life, packed, detect_cycles, to_db, profile,
+         census, rule)
+        for run_seed in spawn_seeds(seed, num_runs)
+    ]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        results = list(executor.map(_run_one, jobs))
+    for _, output_path in results:
+        print(f"Saved simulation to: {output_path}")
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a batch of Game of Life simulations.")
+    parser.add_argument("--runs", type=int, help="Number of runs (skips the prompt, no upper limit)")
+    parser.add_argument("--prob", type=float, help="Probability of life (skips the prompt)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; 0 uses every core (default: 1, serial)")
+    parser.add_argument("--seed", type=int, help="Root seed for reproducible batches")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--cols", type=int, default=150)
+    parser.add_argument("--packed", action="store_true", help="Use the bit-packed grid")
+    parser.add_argument("--detect-cycles", action="store_true",
+                        help="Stop runs early once they reach a fixed point or cycle")
+    parser.add_argument("--db", action="store_true",
+                        help="Stream results into $GAME_OF_LIFE_DB instead of CSV files")
+    parser.add_argument("--columnar", metavar="DIR",
+                        help="Append results to a columnar store instead of CSV files (serial only)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-phase timings with each run and print batch totals")
+    parser.add_argument("--rule",
+                        help="Life-like rule, e.g. B36/S23 or highlife (default: B3/S23)")
+    parser.add_argument("--census", action="store_true",
+                        help="Count still lifes, oscillators and spaceships in each final grid")
+    parser.add_argument("--pattern-cache", metavar="FILE",
+                        help="JSON file of classified patterns reused across batches "
+                             "(with --census, serial only)")
+    parser.add_argument("--sample", metavar="FILE",
+                        help="Run the batch under the pyinstrument sampling profiler "
+                             "and write its report (.html or text) to FILE")
+    parser.add_argument("--ensemble", action="store_true",
+                        help="Step all runs together as one 3-D array")
+    return parser.parse_args()
+
+def _check_options(args):
+    """Reject flag combinations that would otherwise be silently ignored.
+
+    Raises:
+        ValueError: If a mode is combined with options it doesn't support
+    """
+    given = {
+        '--rule': args.rule is not None,
+        '--workers': args.workers != 1,
+        '--packed': args.packed,
+        '--detect-cycles': args.detect_cycles,
+        '--db': args.db,
+        '--columnar': args.columnar is not None,
+        '--profile': args.profile,
+        '--census': args.census,
+        '--pattern-cache': args.pattern_cache is not None,
+    }
+    unsupported = {
+        # The ensemble writes CSV files from one process, B3/S23 only
+        '--ensemble': (args.ensemble, list(given)),
+        # run_packed_simulation takes no sink, rule or run options
+        '--packed': (args.packed, ['--rule', '--detect-cycles', '--db', '--columnar',
+                                   '--profile', '--census', '--pattern-cache']),
+        # Workers write CSV files or the database, with per-process caches
+        '--workers': (args.workers != 1, ['--columnar', '--pattern-cache']),
+    }
+    for mode, (active, flags) in unsupported.items():
+        conflicts = [flag for flag in flags if given[flag]]
+        if active and conflicts:
+            raise ValueError(f"{mode} can't be combined with {', '.join(conflicts)}")
+    if args.pattern_cache is not None and not args.census:
+        raise ValueError("--pattern-cache needs --census")
+
 if __name__ == "__main__":
-    # Get user input for probability
-    prob = get_prob_of_life()
-    num = get_num_runs()
-    
+    args = parse_args()
+    _check_options(args)
+
+    # Get user input for anything not given on the command line
+    prob = args.prob if args.prob is not None else get_prob_of_life()
+    num = args.runs if args.runs is not None else get_num_runs()
+    if num < 1:
+        raise ValueError("--runs must be at least 1")
+
     # Run simulation with user-specified probability
     print(f"\nRunning simulation with probability of life: {prob}")
-    run_batch_simulations(num_runs=num, prob_of_life=prob)
\ No newline at end of file
+    with sampling_profiler(args.sample) if args.sample else nullcontext():
+        if args.ensemble:
+            run_ensemble_batch(num_runs=num, prob_of_life=prob, rows=args.rows, cols=args.cols,
+                               seed=args.seed)
+        elif args.workers == 1:
+            run_batch_simulations(num_runs=num, prob_of_life=prob, rows=args.rows,
+                                  cols=args.cols, packed=args.packed,
+                                  detect_cycles=args.detect_cycles, to_db=args.db,
+                                  columnar=args.columnar, profile=args.profile,
+                                  census=args.census, pattern_cache=args.pattern_cache,
+                                  rule=args.rule, seed=args.seed)
+        else:
+            run_parallel_batch_simulations(num_runs=num, prob_of_life=prob, rows=args.rows,
+                                           cols=args.cols, packed=args.packed,
+                                           workers=args.workers or None, seed=args.seed,
+                                           detect_cycles=args.detect_cycles, to_db=args.db,
+                                           profile=args.profile, census=args.census,
+                                           rule=args.rule)
@@ -0,0 +1,402 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from itertools import product
+import numpy as np
+
+import DataBase
+import Query_Density
+from game_of_life_core import (
+    generation_stats, initialize_grid, run_simulation, save_to_csv, update_grid
+)
+
+# Metrics where a larger value is better end in _per_s; for every other
+# metric (seconds, latency, memory) smaller is better
+HIGHER_IS_BETTER_SUFFIX = "_per_s"
+
+DEFAULT_SIZES = ("100x150", "500x500")
+DEFAULT_DENSITIES = (0.1, 0.3)
+DEFAULT_GENERATIONS = (100, 1000)
+
+
+def _time(fn, setup=None, repeat=3):
+    """Best wall time of fn(setup()) over repeat runs, plus its peak traced memory.
+
+    Peak memory is taken from one extra run under tracemalloc (which
+    slows things down, so it is not timed).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state)
+        best = min(best, time.perf_counter() - start)
+
+    state = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def synthetic_records(run_id, rows, cols, prob_of_life, generations, log_interval=100, rng=None):
+    """Records shaped like run_simulation's output, with random statistics."""
+    rng = rng or np.random.default_rng()
+    size = rows * cols
+    records = []
+    for generation in range(0, generations + 1, log_interval):
+        alive = int(rng.binomial(size, prob_of_life))
+        born, died = (int(x) for x in rng.integers(0, size // 20 + 1, 2))
+        records.append({
+            'run_id': run_id,
+            'grid_size': f"{rows}x{cols}",
+            'probability_of_life': prob_of_life,
+            'total_generations': generations,
+            'generation': generation,
+            'alive_cells': alive,
+            'dead_cells': size - alive,
+            'born_cells': born,
+            'died_cells': died,
+            'stability_index': (born + died) / size,
+            'density': alive / size * 100,
+        })
+    return records
+
+
+def bench_step(rows, cols, density, generations, engine=None, repeat=3):
+    """update_grid alone, generations times."""
+    def setup():
+        return initialize_grid(rows, cols, density, seed=0)
+
+    def run(grid):
+        for _ in range(generations):
+            grid = update_grid(grid, engine)
+
+    seconds, peak = _time(run, setup, repeat)
+    return {
+        'seconds': seconds,
+        'generations_per_s': generations / seconds,
+        'cells_per_s': generations * rows * cols / seconds,
+        'peak_mb': peak,
+    }
+
+
+def bench_stats(rows, cols, density, calls=100, repeat=3):
+    """generation_stats on consecutive generations."""
+    def setup():
+        grid = initialize_grid(rows, cols, density, seed=0)
+        return grid, update_grid(grid)
+
+    def run(grids):
+        previous, grid = grids
+        for _ in range(calls):
+            generation_stats(grid, previous)
+
+    seconds, peak = _time(run, setup, repeat)
+    return {
+        'seconds': seconds,
+        'calls_per_s': calls / seconds,
+        'cells_per_s': calls * rows * cols / seconds,
+        'peak_mb': peak,
+    }
+
+
+def bench_run_simulation(rows, cols, density, generations, repeat=3):
+    """run_simulation end to end (stepping plus stats every 100 generations)."""
+    def run(_):
+        run_simulation(rows, cols, density, generations, run_id="bench", seed=0)
+
+    seconds, peak = _time(run, repeat=repeat)
+    return {
+        'seconds': seconds,
+        'generations_per_s': generations / seconds,
+        'cells_per_s': generations * rows * cols / seconds,
+        'peak_mb': peak,
+    }
+
+
+@contextmanager
+def scratch_directory():
+    """Throwaway directory that GAME_OF_LIFE_DB points at until the block exits."""
+    root = tempfile.mkdtemp(prefix="gol_bench_")
+    previous = os.environ.get("GAME_OF_LIFE_DB")
+    os.environ["GAME_OF_LIFE_DB"] = root
+    try:
+        yield root
+    finally:
+        if previous is None:
+            del os.environ["GAME_OF_LIFE_DB"]
+        else:
+            os.environ["GAME_OF_LIFE_DB"] = previous
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_save_to_csv(runs, generations, root, repeat=3):
+    """save_to_csv for `runs` runs of synthetic records, written under root."""
+    rng = np.random.default_rng(0)
+    data = [synthetic_records(f"run{i}", 100, 150, 0.1, generations, rng=rng)
+            for i in range(runs)]
+    out_dir = os.path.join(root, "save_to_csv")
+    os.makedirs(out_dir, exist_ok=True)
+
+    def run(_):
+        for i, records in enumerate(data):
+            save_to_csv(records, os.path.join(out_dir, "game_of_life"), run_id=f"run{i}")
+
+    seconds, peak = _time(run, repeat=repeat)
+    rows_written = sum(len(records) for records in data)
+    return {'seconds': seconds, 'rows_per_s': rows_written / seconds, 'peak_mb': peak}
+
+
+def _csv_directory(runs, generations, root):
+    """Fresh directory (under root) of synthetic CSV files and an empty database."""
+    directory = tempfile.mkdtemp(dir=root)
+    rng = np.random.default_rng(0)
+    for i in range(runs):
+        records = synthetic_records(f"run{i}", 100, 150, (0.1, 0.3)[i % 2], generations, rng=rng)
+        save_to_csv(records, os.path.join(directory, "game_of_life"), run_id=f"run{i}")
+    db = os.path.join(directory, "bench.db")
+    return directory, db
+
+
+def bench_import(runs, generations, root, bulk=False, repeat=3):
+    """import_csv_to_db per file, or bulk_import_csv_files, into an empty database."""
+    import csv_2_DB  # reads GAME_OF_LIFE_DB when imported
+
+    rows_ingested = runs * (generations // 100 + 1)
+
+    def run(state):
+        directory, db = state
+        if bulk:
+            csv_2_DB.bulk_import_csv_files(directory, workers=1, db=db)
+        else:
+            csv_2_DB.db_path = db
+            csv_2_DB.process_all_csv_files(directory)
+
+    # Both importers print per file; keep the report readable
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        seconds, peak = _time(run, lambda: _csv_directory(runs, generations, root), repeat)
+    return {'seconds': seconds, 'rows_per_s': rows_ingested / seconds, 'peak_mb': peak}
+
+
+def bench_queries(runs, generations, root, repeat=5):
+    """Dashboard queries against a database of `runs` synthetic runs."""
+    db_dir = tempfile.mkdtemp(dir=root)
+    os.environ["GAME_OF_LIFE_DB"] = db_dir
+    conn = sqlite3.connect(DataBase.get_db_path())
+    DataBase.create_tables(conn)
+    rng = np.random.default_rng(0)
+    with conn:
+        for i in range(runs):
+            DataBase.insert_records(conn, synthetic_records(
+                f"run{i}", 100, 150, (0.1, 0.2, 0.3)[i % 3], generations, rng=rng))
+    conn.close()
+
+    results = {}
+    for name, query in (
+        ('density_by_probability', Query_Density.get_density_by_probability),
+        ('density_histograms', Query_Density.get_density_histograms),
+        ('density_histograms_raw', lambda: Query_Density.get_density_histograms(raw=True)),
+    ):
+        seconds, peak = _time(lambda _: query(), repeat=repeat)
+        results[f'{name}_ms'] = seconds * 1000
+        results[f'{name}_peak_mb'] = peak
+    os.environ["GAME_OF_LIFE_DB"] = root
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES,
+                   generations=DEFAULT_GENERATIONS, engines=(None,), io_runs=200,
+                   query_runs=2000, repeat=3, only=None):
+    """Run the benchmark matrix.
+
+    Files and databases go to a scratch directory (see
+    scratch_directory) that is removed afterwards.
+
+    Args:
+        sizes (tuple): Grid sizes as 'ROWSxCOLS' strings
+        densities (tuple): Initial probabilities of life
+        generations (tuple): Generation counts for the stepping benchmarks
+        engines (tuple): Stepping engines for the 'step' benchmark
+        io_runs (int): Runs of synthetic records for CSV writing/importing
+        query_runs (int): Runs of synthetic records in the query database
+        repeat (int): Timed repetitions; the best one is reported
+        only (set): Benchmark names to run (default: all)
+
+    Returns:
+        list: {'name', 'params', 'metrics'} dicts
+    """
+    results = []
+
+    def record(name, params, fn, *args, **kwargs):
+        if only and name not in only:
+            return
+        metrics = fn(*args, **kwargs)
+        results.append({'name': name, 'params': params, 'metrics': metrics})
+        print(f"{name:<16} {_format_params(params):<48} {_format_metrics(metrics)}")
+
+    for size, density in product(sizes, densities):
+        rows, cols = DataBase.parse_grid_size(size)
+        if rows is None:
+            raise ValueError(f"Invalid grid size '{size}'; use ROWSxCOLS")
+        record('stats', {'size': size, 'density': density},
+               bench_stats, rows, cols, density, repeat=repeat)
+        for gens, engine in product(generations, engines):
+            record('step', {'size': size, 'density': density, 'generations': gens,
+                            'engine': engine or 'default'},
+                   bench_step, rows, cols, density, gens, engine, repeat=repeat)
+        for gens in generations:
+            record('run_simulation', {'size': size, 'density': density, 'generations': gens},
+                   bench_run_simulation, rows, cols, density, gens, repeat=repeat)
+
+    io_generations = max(generations)
+    with scratch_directory() as root:
+        record('save_to_csv', {'runs': io_runs, 'generations': io_generations},
+               bench_save_to_csv, io_runs, io_generations, root, repeat=repeat)
+        record('import_csv', {'runs': io_runs, 'generations': io_generations},
+               bench_import, io_runs, io_generations, root, repeat=repeat)
+        record('import_csv_bulk', {'runs': io_runs, 'generations': io_generations},
+               bench_import, io_runs, io_generations, root, bulk=True, repeat=repeat)
+        record('queries', {'runs': query_runs, 'generations': io_generations},
+               bench_queries, query_runs, io_generations, root)
+    return results
+
+
+def _format_params(params):
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def _format_metrics(metrics):
+    return "  ".join(f"{key}={value:.4g}" for key, value in metrics.items())
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results, path):
+    """Write results plus machine and commit details as JSON."""
+    payload = {
+        'commit': _git_commit(),
+        'created': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """Compare two saved result files metric by metric.
+
+    Benchmarks are matched on name and parameters. A metric regresses
+    when it is more than `threshold` (a fraction) worse than the baseline.
+
+    Args:
+        baseline (str): Path of the older results
+        current (str): Path of the newer results
+        threshold (float): Allowed relative slowdown
+
+    Returns:
+        list: (benchmark, params, metric, old, new, relative change,
+               regressed) tuples; change > 0 always means better
+    """
+    def load(path):
+        with open(path) as f:
+            payload = json.load(f)
+        return {(r['name'], json.dumps(r['params'], sort_keys=True)): r['metrics']
+                for r in payload['results']}
+
+    old_results, new_results = load(baseline), load(current)
+    rows = []
+    for key in sorted(old_results.keys() & new_results.keys()):
+        old_metrics, new_metrics = old_results[key], new_results[key]
+        for metric in sorted(old_metrics.keys() & new_metrics.keys()):
+            old, new = old_metrics[metric], new_metrics[metric]
+            if not old or not new:
+                continue
+            if metric.endswith(HIGHER_IS_BETTER_SUFFIX):
+                change = new / old - 1
+            else:
+                change = old / new - 1
+            rows.append((key[0], json.loads(key[1]), metric, old, new, change,
+                         change < -threshold))
+    return rows
+
+
+def _split(value, kind=str):
+    return tuple(kind(item) for item in value.split(",") if item)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark stepping, stats, CSV I/O, ingest and queries on synthetic data.")
+    parser.add_argument("--sizes", type=_split, default=DEFAULT_SIZES,
+                        help="Comma-separated grid sizes (default: %(default)s)")
+    parser.add_argument("--densities", type=lambda v: _split(v, float), default=DEFAULT_DENSITIES,
+                        help="Comma-separated probabilities of life")
+    parser.add_argument("--generations", type=lambda v: _split(v, int),
+                        default=DEFAULT_GENERATIONS, help="Comma-separated generation counts")
+    parser.add_argument("--engines", type=_split, default=(None,),
+                        help="Comma-separated stepping engines for 'step' (default: update_grid's)")
+    parser.add_argument("--io-runs", type=int, default=200,
+                        help="Synthetic runs written and imported as CSV")
+    parser.add_argument("--query-runs", type=int, default=2000,
+                        help="Synthetic runs in the query database")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", type=_split,
+                        help="Comma-separated benchmarks: step, stats, run_simulation, "
+                             "save_to_csv, import_csv, import_csv_bulk, queries")
+    parser.add_argument("--quick", action="store_true",
+                        help="Small sizes and counts for a fast smoke run")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown counted as a regression (default: 0.10)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.quick:
+        args.sizes, args.densities, args.generations = ("64x64",), (0.3,), (100,)
+        args.io_runs, args.query_runs, args.repeat = 20, 200, 1
+
+    results = run_benchmarks(args.sizes, args.densities, args.generations, args.engines,
+                             args.io_runs, args.query_runs, args.repeat,
+                             set(args.only) if args.only else None)
+    print(f"\nSaved results to {save_results(results, args.output)}")
+
+    if args.baseline:
+        rows = compare_results(args.baseline, args.output, args.threshold)
+        regressions = [row for row in rows if row[-1]]
+        for name, params, metric, old, new, change, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:<16} {_format_params(params):<48} {metric:<28} "
+                  f"{old:>12.4g} -> {new:<12.4g} {change:+7.1%} {flag}")
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}")
+        if regressions:
+            raise SystemExit(1)
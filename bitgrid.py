@@ -0,0 +1,234 @@
+import numpy as np
+from game_of_life_core import new_run_id
+from rules import CONWAY
+from seeding import new_seed, random_rows
+
+WORD_BITS = 64
+
+# Popcount table for the uint8 fallback on NumPy < 2.0
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+    """Count set bits across an array of uint64 words.
+
+    Returns:
+        int: Total number of set bits
+    """
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(_BYTE_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class BitGrid:
+    """Game of Life grid packed one bit per cell into uint64 words.
+
+    Row r, column c lives in bit (c % 64) of word words[r, c // 64]. Bits
+    past the last column in the final word of each row are always zero,
+    so popcounts over the whole array count live cells directly. The
+    board wraps around at the edges like update_grid.
+    """
+
+    def __init__(self, words, cols):
+        self.words = words
+        self.rows = words.shape[0]
+        self.cols = cols
+        self._tail_mask = _tail_mask(cols)
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    @property
+    def size(self):
+        return self.rows * self.cols
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    @classmethod
+    def from_array(cls, grid):
+        """Pack a 2-D 0/1 array into a BitGrid."""
+        rows, cols = grid.shape
+        packed = np.packbits(np.asarray(grid, dtype=bool), axis=1, bitorder="little")
+        return cls(_bytes_to_words(packed, cols), cols)
+
+    @classmethod
+    def random(cls, rows, cols, prob_of_life, chunk_rows=256, seed=None):
+        """Create a random packed grid without materializing the full board.
+
+        Rows are drawn and packed chunk_rows at a time, so peak memory is
+        one chunk of cells plus the packed result. The cells are those of
+        initialize_grid with the same seed (None draws a fresh one).
+        """
+        seed = new_seed() if seed is None else seed
+        nwords = -(-cols // WORD_BITS)
+        words = np.empty((rows, nwords), dtype=np.uint64)
+        for start, stop, alive in random_rows(rows, cols, prob_of_life, seed, chunk_rows):
+            packed = np.packbits(alive, axis=1, bitorder="little")
+            words[start:stop] = _bytes_to_words(packed, cols)
+        return cls(words, cols)
+
+    def to_array(self, dtype=np.uint8):
+        """Unpack into a regular 2-D array of 0/1 values."""
+        as_bytes = self.words.astype("<u8", copy=False).view(np.uint8)
+        cells = np.unpackbits(as_bytes, axis=1, count=self.cols, bitorder="little")
+        return cells.astype(dtype, copy=False)
+
+    def copy(self):
+        return BitGrid(self.words.copy(), self.cols)
+
+    def alive(self):
+        """Number of live cells."""
+        return popcount(self.words)
+
+    def step(self):
+        """Compute one generation with bitwise-parallel adders.
+
+        Each uint64 word advances 64 cells at once. The eight neighbor
+        bitplanes are summed with half/full adders into a 4-bit count,
+        and Conway's rule is applied to the count bits.
+
+        Returns:
+            BitGrid: The next generation
+        """
+        w = self.words
+        up = np.roll(w, 1, axis=0)     # row above each cell
+        down = np.roll(w, -1, axis=0)  # row below each cell
+
+        # Two-bit sums of (left, center, right) for the rows above and below
+        t0, t1 = _row_sum3(up, self.cols)
+        b0, b1 = _row_sum3(down, self.cols)
+        # Left + right only for the center row (the cell itself is excluded)
+        left, right = _horizontal_neighbors(w, self.cols)
+        m0 = left ^ right
+        m1 = left & right
+
+        # a = top + bottom (0..6)
+        a0 = t0 ^ b0
+        carry = t0 & b0
+        a1 = t1 ^ b1 ^ carry
+        a2 = (t1 & b1) | (carry & (t1 ^ b1))
+
+        # n = a + middle (0..8)
+        n0 = a0 ^ m0
+        carry = a0 & m0
+        n1 = a1 ^ m1 ^ carry
+        carry = (a1 & m1) | (carry & (a1 ^ m1))
+        n2 = a2 ^ carry
+        n3 = a2 & carry
+
+        # Alive next if count == 3, or count == 2 and alive now
+        new_words = n1 & ~(n2 | n3) & (n0 | w)
+        new_words[:, -1] &= self._tail_mask
+        return BitGrid(new_words, self.cols)
+
+    def transition_stats(self, previous):
+        """Compute run_simulation's statistics from packed words.
+
+        Args:
+            previous (BitGrid): Grid from the previous generation
+
+        Returns:
+            dict: alive_cells, dead_cells, born_cells, died_cells,
+                  stability_index and density
+        """
+        alive_cells = self.alive()
+        born_cells = popcount(self.words & ~previous.words)
+        died_cells = popcount(previous.words & ~self.words)
+        changed = born_cells + died_cells
+        return {
+            'alive_cells': alive_cells,
+            'dead_cells': self.size - alive_cells,
+            'born_cells': born_cells,
+            'died_cells': died_cells,
+            'stability_index': changed / self.size,
+            'density': (alive_cells / self.size) * 100,
+        }
+
+
+def _tail_mask(cols):
+    """Mask of the valid bits in the last word of each row."""
+    used = cols % WORD_BITS
+    if used == 0:
+        return np.uint64(0xFFFFFFFFFFFFFFFF)
+    return np.uint64((1 << used) - 1)
+
+
+def _bytes_to_words(packed, cols):
+    """Pad packed uint8 rows to whole words and view them as uint64."""
+    rows = packed.shape[0]
+    nwords = -(-cols // WORD_BITS)
+    padded = np.zeros((rows, nwords * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view("<u8").astype(np.uint64, copy=False)
+
+
+def _horizontal_neighbors(w, cols):
+    """Return bitplanes of each cell's left and right neighbor, wrapped."""
+    one = np.uint64(1)
+    top_bit = np.uint64(WORD_BITS - 1)
+    last_word, last_bit = divmod(cols - 1, WORD_BITS)
+
+    # left[c] = cell[c - 1]: shift toward higher bits, carrying across words
+    left = w << one
+    left[:, 1:] |= w[:, :-1] >> top_bit
+    left[:, 0] |= (w[:, last_word] >> np.uint64(last_bit)) & one
+
+    # right[c] = cell[c + 1]: shift toward lower bits, carrying across words
+    right = w >> one
+    right[:, :-1] |= w[:, 1:] << top_bit
+    right[:, last_word] |= (w[:, 0] & one) << np.uint64(last_bit)
+    return left, right
+
+
+def _row_sum3(w, cols):
+    """Two-bit sum of left + center + right for every cell of a row plane."""
+    left, right = _horizontal_neighbors(w, cols)
+    partial = left ^ w
+    s0 = partial ^ right
+    s1 = (left & w) | (right & partial)
+    return s0, s1
+
+
+def run_packed_simulation(rows=100, cols=150, prob_of_life=0.1, generations=1000,
+                          log_interval=100, run_id=None, seed=None):
+    """Run the simulation on a bit-packed grid.
+
+    Uses 1 bit per cell instead of a byte, so boards such as 10k x 10k
+    fit comfortably in memory. Returns records in the same format as
+    game_of_life_core.run_simulation.
+
+    Args:
+        seed (int): Seed of the initial grid; None draws a fresh one.
+            The same seed gives the same run as run_simulation.
+
+    Returns:
+        tuple: (data, run_id)
+    """
+    run_id = run_id or new_run_id()
+    seed = new_seed() if seed is None else seed
+
+    grid = BitGrid.random(rows, cols, prob_of_life, seed=seed)
+    previous_grid = grid
+    data = []
+
+    for gen in range(generations + 1):
+        if gen % log_interval == 0:
+            record = {
+                'run_id': run_id,
+                'grid_size': f"{rows}x{cols}",
+                'probability_of_life': prob_of_life,
+                'total_generations': generations,
+                'generation': gen,
+            }
+            record.update(grid.transition_stats(previous_grid))
+            record['rule'] = CONWAY
+            record['seed'] = seed
+            data.append(record)
+
+        previous_grid = grid
+        grid = grid.step()
+
+    return data, run_id
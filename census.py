@@ -0,0 +1,224 @@
+import json
+import os
+import numpy as np
+from engines import count_neighbors_padded
+from rules import get_rule
+
+# Object classes reported by census(), and the run fields they are counted in
+CENSUS_FIELDS = {
+    'still_life': 'still_lifes',
+    'oscillator': 'oscillators',
+    'spaceship': 'spaceships',
+}
+
+# Cells closer than this (Chebyshev distance) are grouped into one object,
+# since they can affect each other's next generation
+INTERACTION_RADIUS = 2
+
+# Offsets to the "forward" half of the interaction neighborhood, so that
+# each pair of nearby cells is linked once
+_LINK_OFFSETS = [
+    (dr, dc)
+    for dr in range(0, INTERACTION_RADIUS + 1)
+    for dc in range(-INTERACTION_RADIUS, INTERACTION_RADIUS + 1)
+    if dr > 0 or dc > 0
+]
+
+
+def label_objects(grid):
+    """Group live cells into objects on a torus.
+
+    Live cells within INTERACTION_RADIUS of each other are linked, and
+    connected groups are found by vectorized min-label propagation with
+    pointer jumping (a union-find without a per-cell Python loop).
+
+    Args:
+        grid (np.ndarray): 2-D grid (1=alive, 0=dead)
+
+    Returns:
+        list: One (row_indices, col_indices) pair per object
+    """
+    alive = grid.astype(bool, copy=False)
+    rows_idx, cols_idx = np.nonzero(alive)
+    if rows_idx.size == 0:
+        return []
+    index = np.full(alive.shape, -1, dtype=np.int64)
+    index[rows_idx, cols_idx] = np.arange(rows_idx.size)
+
+    # Pairs (a, b) of nearby live cells; np.roll gives the torus wrap
+    links_a, links_b = [], []
+    for dr, dc in _LINK_OFFSETS:
+        shifted = np.roll(index, (-dr, -dc), axis=(0, 1))
+        both = (index >= 0) & (shifted >= 0)
+        links_a.append(index[both])
+        links_b.append(shifted[both])
+    a, b = np.concatenate(links_a), np.concatenate(links_b)
+
+    labels = np.arange(rows_idx.size)
+    while True:
+        new_labels = labels.copy()
+        lowest = np.minimum(labels[a], labels[b])
+        np.minimum.at(new_labels, a, lowest)
+        np.minimum.at(new_labels, b, lowest)
+        new_labels = new_labels[new_labels]  # pointer jumping
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    order = np.argsort(labels, kind='stable')
+    splits = np.flatnonzero(np.diff(labels[order])) + 1
+    return [(rows_idx[group], cols_idx[group]) for group in np.split(order, splits)]
+
+
+def _unwrap(coords, size):
+    """Shift coordinates of an object that straddles a torus edge together."""
+    if coords.max() - coords.min() > size // 2:
+        coords = np.where(coords < size // 2, coords + size, coords)
+    return coords - coords.min()
+
+
+def object_patch(rows_idx, cols_idx, shape):
+    """Smallest uint8 array holding one object from label_objects."""
+    r = _unwrap(rows_idx, shape[0])
+    c = _unwrap(cols_idx, shape[1])
+    patch = np.zeros((r.max() + 1, c.max() + 1), dtype=np.uint8)
+    patch[r, c] = 1
+    return patch
+
+
+def _trim(board):
+    """Crop a board to its live cells; returns (patch, top-left offset)."""
+    live_rows = np.flatnonzero(board.any(axis=1))
+    live_cols = np.flatnonzero(board.any(axis=0))
+    r0, c0 = live_rows[0], live_cols[0]
+    return board[r0:live_rows[-1] + 1, c0:live_cols[-1] + 1], (r0, c0)
+
+
+def canonical_key(patch):
+    """Rotation- and reflection-invariant key for a trimmed pattern.
+
+    The smallest encoding (shape plus packed cells) over the 8 symmetries
+    of the square, so all orientations of a pattern share one key.
+
+    Returns:
+        bytes
+    """
+    return min(_pattern_bytes(np.rot90(flipped, k))
+               for flipped in (patch, patch.T) for k in range(4))
+
+
+def _pattern_bytes(patch):
+    """Exact (orientation-dependent) encoding of a trimmed pattern."""
+    return np.array(patch.shape, dtype=np.uint32).tobytes() + np.packbits(patch).tobytes()
+
+
+def classify_pattern(patch, max_period=15, rule=None):
+    """Classify an isolated pattern by stepping it on an empty plane.
+
+    Args:
+        patch (np.ndarray): Trimmed pattern
+        max_period (int): Longest period looked for
+        rule (str): Life-like rule (see rules.get_rule); default B3/S23
+
+    Returns:
+        tuple: (kind, period) where kind is 'still_life', 'oscillator',
+               'spaceship' or 'other' (dies, grows, or has a longer period)
+    """
+    rule = get_rule(rule)
+    margin = max_period + 2
+    board = np.pad(patch, margin)
+    for period in range(1, max_period + 1):
+        board = rule.apply(board, count_neighbors_padded(np.pad(board, 1)))
+        if not board.any():
+            return 'other', None
+        edge = np.concatenate([board[0], board[-1], board[:, 0], board[:, -1]])
+        if edge.any():
+            return 'other', None  # outgrew the margin
+        current, offset = _trim(board)
+        if current.shape == patch.shape and np.array_equal(current, patch):
+            if offset != (margin, margin):
+                return 'spaceship', period
+            return ('still_life' if period == 1 else 'oscillator'), period
+    return 'other', None
+
+
+class PatternCache:
+    """(rule, canonical pattern key) -> (kind, period) lookup.
+
+    Every distinct shape is classified once; afterwards blocks, blinkers,
+    gliders and the like are a dictionary hit. Orientations already seen
+    are looked up by their exact encoding before the 8-way canonical key
+    is computed. With a path the cache is loaded from and saved to a JSON
+    file, so it carries over between runs and processes.
+
+    Args:
+        path (str): Optional JSON file backing the cache
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._patterns = {}
+        self._seen = {}  # exact encoding -> result, for orientations already met
+        self._dirty = False
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._patterns = {bytes.fromhex(key): tuple(value)
+                                  for key, value in json.load(f).items()}
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def classify(self, patch, max_period=15, rule=None):
+        """(kind, period) of a trimmed pattern, as from classify_pattern."""
+        prefix = get_rule(rule).rulestring.encode() + b":"
+        exact = prefix + _pattern_bytes(patch)
+        result = self._seen.get(exact)
+        if result is not None:
+            return result
+        key = prefix + canonical_key(patch)
+        result = self._patterns.get(key)
+        if result is None:
+            result = classify_pattern(patch, max_period, rule)
+            self._patterns[key] = result
+            self._dirty = True
+        self._seen[exact] = result
+        return result
+
+    def save(self):
+        """Write new entries back to the cache file (if it has one)."""
+        if not self.path or not self._dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({key.hex(): value for key, value in self._patterns.items()}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+# Shared by every census() call in this process that doesn't pass a cache
+DEFAULT_CACHE = PatternCache()
+
+
+def census(grid, cache=None, max_period=15, rule=None):
+    """Count still lifes, oscillators and spaceships in a grid.
+
+    Objects are found with label_objects and classified in isolation
+    (see classify_pattern) through the cache. Anything else (growing or
+    dying debris, longer periods, interacting clusters) is counted under
+    'other_objects'.
+
+    Args:
+        grid (np.ndarray): 2-D grid (1=alive, 0=dead)
+        cache (PatternCache): Lookup cache (default: DEFAULT_CACHE)
+        max_period (int): Longest period looked for
+        rule (str): Life-like rule the grid evolves under; default B3/S23
+
+    Returns:
+        dict: still_lifes, oscillators, spaceships and other_objects counts
+    """
+    cache = cache if cache is not None else DEFAULT_CACHE
+    counts = dict.fromkeys(list(CENSUS_FIELDS.values()) + ['other_objects'], 0)
+    for rows_idx, cols_idx in label_objects(grid):
+        kind, _ = cache.classify(object_patch(rows_idx, cols_idx, grid.shape), max_period, rule)
+        counts[CENSUS_FIELDS.get(kind, 'other_objects')] += 1
+    return counts
@@ -0,0 +1,289 @@
+import argparse
+import ast
+import csv
+import json
+import os
+import sqlite3
+import numpy as np
+from DataBase import FLAT_COLUMNS, RUN_COLUMNS, STAT_COLUMNS, to_builtin
+
+# Row columns and their dtypes. 'run' is the index of the row's run in
+# runs.json, so rows from any number of runs live in one file per column.
+COLUMNS = {
+    'run': np.int32,
+    'generation': np.int64,
+    'alive_cells': np.int64,
+    'dead_cells': np.int64,
+    'born_cells': np.int64,
+    'died_cells': np.int64,
+    'stability_index': np.float64,
+    'density': np.float64,
+}
+
+# Per-run fields kept in runs.json
+RUN_FIELDS = ('grid_size',) + RUN_COLUMNS
+
+# Every column file starts with a fixed-size .npy header, so the row
+# count can be rewritten in place as rows are appended
+_MAGIC = b"\x93NUMPY\x01\x00"
+HEADER_SIZE = 128
+
+
+def _header(dtype, length):
+    header = repr({
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': (length,),
+    })
+    header = header.ljust(HEADER_SIZE - len(_MAGIC) - 2 - 1) + "\n"
+    return _MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+
+def _read_length(path):
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE or not raw.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a columnar store file")
+    return ast.literal_eval(raw[len(_MAGIC) + 2:].decode("latin1"))['shape'][0]
+
+
+class ColumnarStore:
+    """Append-only columnar store of per-generation statistics.
+
+    Each column is a single .npy file covering all runs, so a whole store
+    loads as a handful of read-only memory maps with no parsing or
+    copying. Records are buffered and appended in chunks of chunk_rows;
+    a row becomes visible once its chunk is flushed. The header row
+    count of each file is only advanced after the chunk's data is
+    written, so a crash loses at most the unflushed chunk and the store
+    reopens cleanly. Only one process may write to a store at a time.
+    Missing values are stored as NaN (float columns) or -1.
+
+    Layout::
+
+        root/runs.json     per-run metadata, in run order
+        root/<column>.npy  one file per entry of COLUMNS
+
+    Args:
+        root (str): Directory holding the store
+        chunk_rows (int): Rows buffered before they are written out
+        read_only (bool): Open for loading only; safe while another
+            process is writing
+    """
+
+    def __init__(self, root, chunk_rows=4096, read_only=False):
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.read_only = read_only
+        if not read_only:
+            os.makedirs(root, exist_ok=True)
+        self._runs = self._load_runs()
+        self._run_index = {run['run_id']: i for i, run in enumerate(self._runs)}
+        self._runs_dirty = False
+        self._buffer = []
+        self._current_run = None
+        if read_only:
+            self._length = min(_read_length(self._path(column)) for column in COLUMNS)
+        else:
+            self._length = self._recover()
+
+    def _path(self, column):
+        return os.path.join(self.root, f"{column}.npy")
+
+    def _load_runs(self):
+        path = os.path.join(self.root, "runs.json")
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)
+
+    def _recover(self):
+        """Create missing column files and cut all columns to a common length."""
+        lengths = {}
+        for column, dtype in COLUMNS.items():
+            path = self._path(column)
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(_header(dtype, 0))
+            lengths[column] = _read_length(path)
+        length = min(lengths.values())
+        for column, dtype in COLUMNS.items():
+            with open(self._path(column), "r+b") as f:
+                if lengths[column] != length:
+                    f.write(_header(dtype, length))
+                # Drop bytes of a chunk whose header was never updated
+                f.truncate(HEADER_SIZE + length * np.dtype(dtype).itemsize)
+        return length
+
+    def __len__(self):
+        return self._length
+
+    def append(self, records):
+        """Add flat records (dicts keyed like run_simulation's output).
+
+        As in DataBase.insert_records, a record without a run_id belongs
+        to the previous record's run and a record without a generation
+        only carries run metadata.
+        """
+        if self.read_only:
+            raise ValueError("Store was opened read-only")
+        for record in records:
+            run_id = record.get('run_id') or self._current_run
+            if run_id is None:
+                continue
+            self._current_run = run_id
+            run = self._run(run_id)
+            for field in RUN_FIELDS:
+                value = record.get(field)
+                if value is not None and run.get(field) != to_builtin(value):
+                    run[field] = to_builtin(value)
+                    self._runs_dirty = True
+            if record.get('generation') is None:
+                continue
+            row = [self._run_index[run_id]]
+            row.extend(record.get(column) for column in list(COLUMNS)[1:])
+            self._buffer.append(row)
+            if len(self._buffer) >= self.chunk_rows:
+                self.flush()
+
+    def _run(self, run_id):
+        if run_id not in self._run_index:
+            self._run_index[run_id] = len(self._runs)
+            self._runs.append({'run_id': run_id})
+            self._runs_dirty = True
+        return self._runs[self._run_index[run_id]]
+
+    def flush(self):
+        """Write buffered rows to the column files."""
+        if self._runs_dirty:
+            path = os.path.join(self.root, "runs.json")
+            with open(f"{path}.tmp", "w") as f:
+                json.dump(self._runs, f)
+            os.replace(f"{path}.tmp", path)
+            self._runs_dirty = False
+        if not self._buffer:
+            return
+        rows = list(zip(*self._buffer))
+        length = self._length + len(self._buffer)
+        for (column, dtype), values in zip(COLUMNS.items(), rows):
+            missing = np.nan if np.dtype(dtype).kind == 'f' else -1
+            chunk = np.array([missing if v is None else v for v in values], dtype=dtype)
+            with open(self._path(column), "r+b") as f:
+                f.seek(HEADER_SIZE + self._length * np.dtype(dtype).itemsize)
+                f.write(chunk.tobytes())
+        # Publish the new rows only once every column holds them
+        for column, dtype in COLUMNS.items():
+            with open(self._path(column), "r+b") as f:
+                f.write(_header(dtype, length))
+        self._length = length
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def runs(self):
+        """Per-run metadata dicts; a row's 'run' value indexes this list."""
+        return list(self._runs)
+
+    def column(self, name):
+        """Memory-map one column (all flushed rows of all runs, read-only)."""
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown column '{name}'. Choose from: {', '.join(COLUMNS)}")
+        if self._length == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.load(self._path(name), mmap_mode="r")[:self._length]
+
+    def load(self, columns=None):
+        """Memory-map several columns.
+
+        Returns:
+            dict: {column: read-only array}, all the same length
+        """
+        return {name: self.column(name) for name in (columns or COLUMNS)}
+
+    def run_rows(self, run_id):
+        """Indices of a run's rows, for indexing the loaded columns."""
+        return np.flatnonzero(self.column('run') == self._run_index[run_id])
+
+
+def _parse_value(value):
+    if not value.strip():
+        return None
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
+
+
+def convert_csv_files(paths, store):
+    """Append CSV files written by save_to_csv or the visualizer to a store.
+
+    Returns:
+        int: Number of rows in the store afterwards
+    """
+    for path in paths:
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            headers = next(reader, [])
+            # The first 11 columns are positional, as in the database importer
+            names = list(FLAT_COLUMNS) + headers[len(FLAT_COLUMNS):]
+            store._current_run = None  # never attribute rows across files
+            store.append(
+                {name: _parse_value(value) for name, value in zip(names, row)}
+                for row in reader if len(row) >= len(FLAT_COLUMNS)
+            )
+    store.flush()
+    return len(store)
+
+
+def convert_database(db_path, store, chunk_rows=100000):
+    """Append every run in a Game of Life database to a store.
+
+    Returns:
+        int: Number of rows in the store afterwards
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        run_fields = [field for field in RUN_FIELDS if field != 'grid_size']
+        for row in conn.execute(f"SELECT run_id, {', '.join(run_fields)} FROM runs"):
+            record = dict(zip(['run_id'] + run_fields, row))
+            if record['rows'] is not None and record['cols'] is not None:
+                record['grid_size'] = f"{record['rows']}x{record['cols']}"
+            store.append([record])
+        cursor = conn.execute(
+            f"SELECT run_id, generation, {', '.join(STAT_COLUMNS)} FROM generations "
+            "ORDER BY run_id, generation"
+        )
+        names = ['run_id', 'generation'] + list(STAT_COLUMNS)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            store.append(dict(zip(names, row)) for row in rows)
+    finally:
+        conn.close()
+    store.flush()
+    return len(store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert results to a columnar store.")
+    parser.add_argument("store", help="Store directory")
+    parser.add_argument("--csv", nargs="+", default=[], help="CSV files to convert")
+    parser.add_argument("--db", help="Database to convert (e.g. $GAME_OF_LIFE_DB/game_of_life.db)")
+    args = parser.parse_args()
+
+    with ColumnarStore(args.store) as store:
+        if args.csv:
+            convert_csv_files(args.csv, store)
+        if args.db:
+            convert_database(args.db, store)
+        print(f"{len(store)} rows from {len(store.runs())} runs in {args.store}")
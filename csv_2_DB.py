@@ -2,24 +2,27 @@ import os
 import sqlite3
 import csv
 import shutil
+import hashlib
+import itertools
+import argparse
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from DataBase import FLAT_COLUMNS, create_tables, get_db_path, insert_records
 
-# Get the database path from an environment variable
-db_directory = os.getenv("GAME_OF_LIFE_DB")
-if not db_directory:
-    raise ValueError("Environment variable GAME_OF_LIFE_DB is not set.")
-
-# Construct the full path to the database file
-db_path = os.path.join(db_directory, "game_of_life.db")
+# Full path to the database file, from the GAME_OF_LIFE_DB environment variable
+db_path = get_db_path()
 
 # Function to import data from a .csv file into the database
 def import_csv_to_db(csv_path):
     """Import CSV data to SQLite database with proper error handling."""
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    create_tables(conn)
+    run_id = None
     
     with open(csv_path, 'r') as csvfile:
         reader = csv.reader(csvfile)
-        headers = next(reader)  # Skip header row
+        headers = next(reader)  # Names of any per-run columns after the 11th
         
         for row in reader:
             try:
@@ -33,11 +36,10 @@ def import_csv_to_db(csv_path):
                     value if value.strip() else None 
                     for value in row
                 ]
+                record = dict(zip(FLAT_COLUMNS, processed_row[:11]))
+                record.update(zip(headers[11:], processed_row[11:]))
                 
-                cursor.execute("""
-                    INSERT INTO generations 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, processed_row)
+                run_id = insert_records(conn, [record], run_id)
                 
             except Exception as e:
                 print(f"Error processing row {row}: {str(e)}")
@@ -64,7 +66,176 @@ def process_all_csv_files(directory="."):
             csv_path = os.path.join(directory, filename)
             import_csv_to_db(csv_path)
 
+# Types of the 11 flat CSV columns (FLAT_COLUMNS), in order
+COLUMN_TYPES = (str, str, float, int, int, int, int, int, int, float, float)
+
+# SQLite settings for bulk loading: WAL lets readers keep working during
+# the import, NORMAL sync is safe with WAL, and a 64 MB page cache
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+)
+
+def connect_bulk(path=None):
+    """Open a connection tuned for bulk inserts and ensure the tables exist."""
+    conn = sqlite3.connect(path or db_path)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    create_tables(conn)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingested_files (
+            digest TEXT PRIMARY KEY,
+            filename TEXT,
+            rows INTEGER,
+            ingested_at TEXT
+        )
+    """)
+    return conn
+
+def _convert(value, kind):
+    """Convert one CSV field the way SQLite's column affinity would."""
+    if not value.strip():
+        return None
+    try:
+        return kind(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+def parse_csv_file(csv_path):
+    """Read and type-convert one CSV file (runs in a worker process).
+
+    Returns:
+        tuple: (csv_path, content digest, list of record dicts, skipped rows)
+    """
+    with open(csv_path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    reader = csv.reader(content.decode().splitlines())
+    headers = next(reader, [])  # Names of any per-run columns after the 11th
+    records, skipped = [], 0
+    for row in reader:
+        if len(row) < 11:
+            skipped += 1
+            continue
+        record = {column: _convert(v, kind)
+                  for column, v, kind in zip(FLAT_COLUMNS, row, COLUMN_TYPES)}
+        record.update((column, _convert(v, int)) for column, v in zip(headers[11:], row[11:]))
+        records.append(record)
+    return csv_path, digest, records, skipped
+
+def _move_to_processed(csv_path):
+    processed_dir = os.path.join(os.path.dirname(csv_path), "processed")
+    os.makedirs(processed_dir, exist_ok=True)
+    shutil.move(csv_path, os.path.join(processed_dir, os.path.basename(csv_path)))
+
+def _parse_in_order(executor, paths, window):
+    """Yield parse_csv_file results in order, at most `window` files in flight.
+
+    executor.map would submit every file up front and let parsed rows pile
+    up while the database writes lag behind.
+    """
+    paths = iter(paths)
+    in_flight = deque(executor.submit(parse_csv_file, path)
+                      for path in itertools.islice(paths, window))
+    while in_flight:
+        result = in_flight.popleft().result()
+        path = next(paths, None)
+        if path is not None:
+            in_flight.append(executor.submit(parse_csv_file, path))
+        yield result
+
+def bulk_import_csv_files(directory=".", workers=None, batch_rows=50000, db=None,
+                          move_processed=True):
+    """Import every .csv in directory using parallel parsing and batched writes.
+
+    Files are parsed and converted in a process pool while this process
+    is the single writer. Rows are inserted with executemany, committing
+    one transaction per batch of about batch_rows rows. Each file's
+    content digest is recorded in the ingested_files manifest in the same
+    transaction as its rows, so re-running the import skips files that
+    are already in the database and never inserts them twice.
+
+    Args:
+        workers (int): Parser processes (default: CPU count)
+        batch_rows (int): Rows per transaction
+        db (str): Database path (default: $GAME_OF_LIFE_DB/game_of_life.db)
+        move_processed (bool): Move imported files into processed/
+
+    Returns:
+        dict: Counts of imported files, skipped (already ingested) files
+              and inserted rows
+    """
+    paths = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(".csv")
+    )
+    conn = connect_bulk(db)
+    known = {row[0] for row in conn.execute("SELECT digest FROM ingested_files")}
+    summary = {'files': 0, 'already_ingested': 0, 'rows': 0}
+    pending_rows, pending_files = [], []
+    pending_spans = []  # each file's slice of pending_rows
+
+    def flush():
+        with conn:  # one transaction per batch
+            for start, end in pending_spans:
+                insert_records(conn, pending_rows[start:end])
+            conn.executemany(
+                "INSERT INTO ingested_files VALUES (?, ?, ?, ?)",
+                [(digest, os.path.basename(path), count, datetime.now().isoformat())
+                 for path, digest, count in pending_files]
+            )
+        for path, _, _ in pending_files:
+            if move_processed:
+                _move_to_processed(path)
+        summary['files'] += len(pending_files)
+        summary['rows'] += len(pending_rows)
+        pending_rows.clear()
+        pending_files.clear()
+        pending_spans.clear()
+
+    try:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for csv_path, digest, rows, skipped in _parse_in_order(executor, paths, 2 * workers):
+                if skipped:
+                    print(f"Skipped {skipped} incomplete rows in {csv_path}")
+                if digest in known:
+                    summary['already_ingested'] += 1
+                    if move_processed:
+                        _move_to_processed(csv_path)
+                    continue
+                known.add(digest)
+                pending_spans.append((len(pending_rows), len(pending_rows) + len(rows)))
+                pending_rows.extend(rows)
+                pending_files.append((csv_path, digest, len(rows)))
+                if len(pending_rows) >= batch_rows:
+                    flush()
+        if pending_files:
+            flush()
+    finally:
+        conn.close()
+
+    print(f"Imported {summary['rows']} rows from {summary['files']} files "
+          f"({summary['already_ingested']} already ingested)")
+    return summary
+
 # Main function
 if __name__ == "__main__":
-    # Process all .csv files in the current directory
-    process_all_csv_files()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import Game of Life CSV files into SQLite.")
+    parser.add_argument("directory", nargs="?", default=".")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Parallel parsing, batched transactions and an ingest manifest")
+    parser.add_argument("--workers", type=int, help="Parser processes for --bulk")
+    args = parser.parse_args()
+
+    if args.bulk:
+        bulk_import_csv_files(args.directory, workers=args.workers)
+    else:
+        # Process all .csv files in the given directory
+        process_all_csv_files(args.directory)
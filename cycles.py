@@ -0,0 +1,71 @@
+import hashlib
+from collections import deque
+import numpy as np
+
+
+def grid_hash(grid):
+    """Hash a grid by its bit-packed bytes.
+
+    Returns:
+        bytes: 16-byte BLAKE2b digest of the packed cells
+    """
+    packed = np.packbits(np.asarray(grid, dtype=bool))
+    return hashlib.blake2b(packed.tobytes(), digest_size=16).digest()
+
+
+class CycleDetector:
+    """Detect fixed points and period-k cycles from recent grid hashes.
+
+    Only the hashes of the last `window` generations are kept, so cycles
+    with a period up to `window` are found and memory stays constant.
+
+    Args:
+        window (int): Number of past generations remembered
+    """
+
+    def __init__(self, window=64):
+        self.window = window
+        self._order = deque()
+        self._seen = {}
+        self.period = None
+        self.stabilization_generation = None
+
+    def observe(self, generation, grid):
+        """Record a generation and check it against the history.
+
+        Generations must be observed consecutively.
+
+        Returns:
+            int or None: The period if grid repeats an earlier generation
+        """
+        key = grid_hash(grid)
+        previous = self._seen.get(key)
+        if previous is not None:
+            self.period = generation - previous
+            self.stabilization_generation = previous
+            return self.period
+
+        self._seen[key] = generation
+        self._order.append(key)
+        if len(self._order) > self.window:
+            del self._seen[self._order.popleft()]
+        return None
+
+
+def cycle_phase_stats(grid, period, step, stats):
+    """Statistics for every phase of a detected cycle.
+
+    Args:
+        grid (np.ndarray): A grid on the cycle (phase 0)
+        period (int): Cycle length
+        step (callable): Stepping engine
+        stats (callable): stats(grid, previous_grid) -> dict
+
+    Returns:
+        list: stats for phase 0..period-1, each taken against the previous
+              phase of the cycle
+    """
+    phases = [grid]
+    for _ in range(period - 1):
+        phases.append(step(phases[-1]))
+    return [stats(phases[k], phases[k - 1]) for k in range(period)]
@@ -0,0 +1,89 @@
+import numpy as np
+from engines import apply_rule, count_neighbors_padded
+from game_of_life_core import new_run_id
+from rules import CONWAY
+from seeding import random_grid, spawn_seeds
+
+
+def step_ensemble(grids):
+    """Advance a stack of grids one generation in a single vectorized pass.
+
+    Args:
+        grids (np.ndarray): (runs, rows, cols) array; each grid wraps at
+            its own edges
+
+    Returns:
+        np.ndarray: Next generation of every grid, same shape and dtype
+    """
+    padded = np.pad(grids.astype(np.uint8, copy=False), ((0, 0), (1, 1), (1, 1)), mode='wrap')
+    return apply_rule(grids, count_neighbors_padded(padded))
+
+
+def ensemble_stats(grids, previous_grids):
+    """Per-run statistics for a stack of grids using axis reductions.
+
+    Returns:
+        dict: Arrays of length runs, keyed like generation_stats
+    """
+    size = grids.shape[1] * grids.shape[2]
+    axes = (1, 2)
+    alive_cells = np.sum(grids, axis=axes, dtype=np.int64)
+    born_cells = np.sum((previous_grids == 0) & (grids == 1), axis=axes)
+    died_cells = np.sum((previous_grids == 1) & (grids == 0), axis=axes)
+    return {
+        'alive_cells': alive_cells,
+        'dead_cells': size - alive_cells,
+        'born_cells': born_cells,
+        'died_cells': died_cells,
+        'stability_index': np.sum(grids != previous_grids, axis=axes) / size,
+        'density': (alive_cells / size) * 100,
+    }
+
+
+def run_ensemble_simulation(num_runs=5, rows=100, cols=150, prob_of_life=0.1,
+                            generations=1000, log_interval=100, run_ids=None, seeds=None):
+    """Run several same-sized simulations together as one 3-D array.
+
+    Grid i is drawn from seeds[i] (straight into the uint8 stack), so
+    each run matches run_simulation(seed=seeds[i]).
+
+    Args:
+        run_ids (list): Optional run IDs, one per run
+        seeds (list): Optional seeds, one per run; by default they are
+            spawned from fresh entropy (see seeding.spawn_seeds)
+
+    Returns:
+        list: (data, run_id) per run, each as returned by run_simulation
+    """
+    run_ids = list(run_ids) if run_ids else [new_run_id() for _ in range(num_runs)]
+    if len(run_ids) != num_runs:
+        raise ValueError("run_ids must have one entry per run")
+    seeds = list(seeds) if seeds is not None else spawn_seeds(None, num_runs)
+    if len(seeds) != num_runs:
+        raise ValueError("seeds must have one entry per run")
+
+    grids = np.empty((num_runs, rows, cols), dtype=np.uint8)
+    for grid, seed in zip(grids, seeds):
+        random_grid(rows, cols, prob_of_life, seed, out=grid)
+    previous_grids = grids
+    results = [([], run_id) for run_id in run_ids]
+
+    for gen in range(generations + 1):
+        if gen % log_interval == 0:
+            stats = ensemble_stats(grids, previous_grids)
+            for i, (data, run_id) in enumerate(results):
+                data.append({
+                    'run_id': run_id,
+                    'grid_size': f"{rows}x{cols}",
+                    'probability_of_life': prob_of_life,
+                    'total_generations': generations,
+                    'generation': gen,
+                    **{key: values[i] for key, values in stats.items()},
+                    'rule': CONWAY,
+                    'seed': seeds[i]
+                })
+
+        previous_grids = grids
+        grids = step_ensemble(grids)
+
+    return results
@@ -1,41 +1,63 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import csv
+import uuid
 from datetime import datetime
+from engines import get_engine
+from rules import get_rule
+from cycles import CycleDetector, cycle_phase_stats
+from render import FrameProducer, export, play
+from profiling import PhaseTimer, active_timer, null_phase, timed
+from census import census as take_census
+from seeding import new_seed, random_grid
+from DataBase import to_builtin
 
-def visualize_simulation(initial_grid, generations=1000, interval=100, writer=None, run_id=None):
+# Phases timed by run_simulation(profile=True); each is recorded with the
+# run as '<phase>_seconds'
+RUN_PHASES = ('step', 'stats', 'cycles', 'logging', 'io', 'census')
+
+def visualize_simulation(initial_grid, generations=1000, interval=100, writer=None, run_id=None,
+                         engine=None, checkpoint_store=None, checkpoint_interval=1000,
+                         sink=None, prob_of_life=None, render_every=1, output=None, fps=30,
+                         queue_size=32, rule=None, seed=None):
     """Run and visualize the Game of Life simulation.
     
+    Stepping and logging run in a background thread (render.FrameProducer)
+    that stays up to queue_size frames ahead of the display, so drawing
+    never slows the simulation down and vice versa.
+    
     Args:
         initial_grid (np.ndarray): Starting grid (1=alive, 0=dead)
         generations (int): Total generations to simulate
         interval (int): Milliseconds between frames
         run_id (str): Optional unique identifier
+        engine (str or callable): Stepping engine (see engines.ENGINES)
+        checkpoint_store (SnapshotStore): Optional store; the grid is saved
+            under run_id every checkpoint_interval frames so a crashed
+            session can restart from store.read_grid(run_id, gen)
+        sink (ResultsSink): Optional sink that receives full records (as
+            from run_simulation) alongside or instead of the CSV writer
+        prob_of_life (float): Recorded in sink records
+        render_every (int): Draw only every k-th generation (all
+            generations are still simulated and logged)
+        output (str): Write the animation to this .gif/.mp4 file instead
+            of opening a window (headless)
+        fps (int): Frame rate of the output file
+        queue_size (int): Frames the simulation may run ahead
+        rule (str): Life-like rule (see engines.get_engine); recorded in
+            sink records
+        seed (int): Seed initial_grid was drawn with (see
+            initialize_grid); recorded in sink records
         
     Returns:
-        matplotlib.animation.FuncAnimation
+        matplotlib.animation.FuncAnimation, or the output path when
+        output is given
     """
-    fig, ax = plt.subplots()
-    img = ax.imshow(initial_grid, interpolation='nearest', cmap='binary')
-    text = ax.text(0.02, 0.95, '', transform=ax.transAxes, color='red')
-    grid = initial_grid.copy()
     previous_grid = initial_grid.copy()
+    rulestring = get_rule(rule).rulestring
     
-    def update_frame(frame_num, img, grid, text):
+    def log_generation(frame_num, grid, new_grid):
         nonlocal previous_grid
         
-        # Stop condition
-        if frame_num >= generations:
-            plt.close(fig)
-            return img, text
-        
-        # Update the grid using the core function
-        new_grid = update_grid(grid)
-        
-        # Visualization update
-        img.set_array(new_grid)
-        
         # Update stats every 100 gens (skipping generation 0)
         if frame_num % 100 == 0 and frame_num != 0:
             alive = np.sum(new_grid)
@@ -45,43 +67,51 @@ def visualize_simulation(initial_grid, generations=1000, interval=100, writer=No
             stability = np.sum(new_grid != previous_grid) / new_grid.size
             density = (alive / new_grid.size) * 100
             
-            # Update display text
-            stats_text = (
-                f'Gen: {frame_num}')
-            text.set_text(stats_text)
-            
             # Print to console (optional)
             print(f"Generation {frame_num}: Alive={alive} | Dead={dead}| Born={born} | Died={died} | stability ={stability} | density={density}")
-            writer.writerow([
-                "", "", "", "",  # skip repeating run_id, grid size, etc.
-                frame_num,
-                alive,
-                dead,
-                born,
-                died,
-                stability,
-                density
-                ])
+            if writer is not None:
+                writer.writerow([
+                    "", "", "", "",  # skip repeating run_id, grid size, etc.
+                    frame_num,
+                    alive,
+                    dead,
+                    born,
+                    died,
+                    stability,
+                    density
+                    ])
+            if sink is not None:
+                sink.write({
+                    'run_id': run_id,
+                    'grid_size': f"{new_grid.shape[0]}x{new_grid.shape[1]}",
+                    'probability_of_life': prob_of_life,
+                    'total_generations': generations,
+                    'generation': frame_num,
+                    'alive_cells': alive,
+                    'dead_cells': dead,
+                    'born_cells': born,
+                    'died_cells': died,
+                    'stability_index': stability,
+                    'density': density,
+                    'rule': rulestring,
+                    'seed': seed
+                })
+        
+        if checkpoint_store is not None and frame_num % checkpoint_interval == 0 and frame_num != 0:
+            checkpoint_store.save(run_id, frame_num, new_grid)
         
         # Maintain state for next frame
-        previous_grid[:] = grid
-        grid[:] = new_grid
-        return img, text
-    
-    ani = animation.FuncAnimation(
-        fig, 
-        update_frame, 
-        fargs=(img, grid, text),
-        frames=generations + 1,
-        interval=interval,
-        blit=True,
-        repeat=False
-    )
-    plt.show()
-    return ani
-
-
-def init_logging(run_id, rows, cols, prob_of_life, generations, filename=None):
+        previous_grid = grid
+    
+    producer = FrameProducer(initial_grid, generations, engine=get_engine(engine, rule),
+                             every=render_every,
+                             queue_size=queue_size, on_generation=log_generation)
+    if output is not None:
+        return export(producer, output, fps=fps)
+    return play(producer, interval=interval)
+
+
+def init_logging(run_id, rows, cols, prob_of_life, generations, filename=None, seed=None):
     """Initialize CSV logging for a simulation run.
     
     Args:
@@ -90,6 +120,8 @@ def init_logging(run_id, rows, cols, prob_of_life, generations, filename=None):
         prob_of_life (float): Initial probability
         generations (int): Total generations
         filename (str): Optional custom filename
+        seed (int): Seed of the initial grid, written to the metadata row
+            so the run can be regenerated after import
         
     Returns:
         tuple: (csv.writer, file_handle) for writing data
@@ -104,13 +136,13 @@ def init_logging(run_id, rows, cols, prob_of_life, generations, filename=None):
     writer.writerow([
         "Run ID", "Grid Size", "Probability of Life", "Total Generations",
         "Generation", "Alive Cells", "Dead Cells", "Born Cells", "Died Cells",
-        "Stability Index", "Density"
+        "Stability Index", "Density", "seed"
     ])
     
     # Write metadata
     writer.writerow([
         run_id, f"{rows}x{cols}", prob_of_life, generations,
-        "", "", "", "", "", "", ""
+        "", "", "", "", "", "", "", seed
     ])
     
     return writer, file
@@ -128,78 +160,257 @@ def log_generation_stats(writer, generation, alive, dead, born, died, stability,
         density
     ])
 
-def initialize_grid(rows, cols, prob_of_life):
-    """Create a random grid with given probability of life."""
-    return np.random.choice([0, 1], size=(rows, cols), p=[1-prob_of_life, prob_of_life])
-
-def update_grid(grid):
-    """Compute one generation of Game of Life."""
-    rows, cols = grid.shape
-    new_grid = grid.copy()
-    for i in range(rows):
-        for j in range(cols):
-            neighbors = (
-                grid[(i-1) % rows, (j-1) % cols] + grid[(i-1) % rows, j] +
-                grid[(i-1) % rows, (j+1) % cols] + grid[i, (j-1) % cols] +
-                grid[i, (j+1) % cols] + grid[(i+1) % rows, (j-1) % cols] +
-                grid[(i+1) % rows, j] + grid[(i+1) % rows, (j+1) % cols]
-            )
-            if grid[i, j] == 1:
-                new_grid[i, j] = 1 if neighbors in [2, 3] else 0
-            else:
-                new_grid[i, j] = 1 if neighbors == 3 else 0
-    return new_grid
+def initialize_grid(rows, cols, prob_of_life, seed=None, dtype=np.uint8):
+    """Create a random grid with given probability of life.
+
+    Args:
+        seed (int): Seed the grid is drawn from (see seeding.random_rows);
+            the same seed always gives the same grid. None draws a fresh
+            one, which is then lost; use seeding.new_seed() to keep it.
+        dtype: Cell dtype (uint8 by default)
+
+    Returns:
+        np.ndarray: rows x cols grid (1=alive, 0=dead)
+    """
+    return random_grid(rows, cols, prob_of_life, new_seed() if seed is None else seed, dtype)
+
+def update_grid(grid, engine=None, rule=None):
+    """Compute one generation of Game of Life.
+
+    Args:
+        grid (np.ndarray): Current grid (1=alive, 0=dead)
+        engine (str or callable): Stepping engine name ('numpy', 'scipy',
+            'loop', 'lut', 'block') or callable; defaults to the NumPy
+            engine
+        rule (str): Life-like rule such as 'B36/S23' or 'highlife';
+            defaults to Conway's B3/S23
+
+    Returns:
+        np.ndarray: Next generation, same shape and dtype as grid
+    """
+    return get_engine(engine, rule)(grid)
+
+def generation_stats(grid, previous_grid):
+    """Compute the per-generation statistics logged by run_simulation.
+
+    Args:
+        grid (np.ndarray): Grid at the current generation
+        previous_grid (np.ndarray): Grid one generation earlier
+
+    Returns:
+        dict: alive_cells, dead_cells, born_cells, died_cells,
+              stability_index and density
+    """
+    alive_cells = np.sum(grid)
+    dead_cells = grid.size - alive_cells
+    born_cells = np.sum((previous_grid == 0) & (grid == 1))
+    died_cells = np.sum((previous_grid == 1) & (grid == 0))
+    stability_index = np.sum(grid != previous_grid) / grid.size
+    density = (alive_cells / grid.size) * 100
+    return {
+        'alive_cells': alive_cells,
+        'dead_cells': dead_cells,
+        'born_cells': born_cells,
+        'died_cells': died_cells,
+        'stability_index': stability_index,
+        'density': density
+    }
 
 def run_simulation(rows=100, cols=150, prob_of_life=0.1, generations=1000, 
-                  log_interval=100, run_id=None):
+                  log_interval=100, run_id=None, engine=None, detect_cycles=False,
+                  cycle_window=64, checkpoint_store=None, checkpoint_interval=1000,
+                  sink=None, profile=False, census=False, pattern_cache=None, rule=None,
+                  seed=None):
     """
     Run the Game of Life simulation.
     
     Args:
         run_id: If None, will generate a new one. Pass this to maintain consistency
                 across multiple saves/exports.
+        engine: Stepping engine name or callable (see engines.ENGINES).
+                Defaults to the vectorized NumPy engine.
+        detect_cycles: Stop as soon as the grid repeats one of the last
+                cycle_window generations (a fixed point or period-k cycle).
+                Remaining logged generations are filled in from the cycle,
+                and every record gains 'period' and
+                'stabilization_generation' fields (None if no cycle was found).
+        checkpoint_store: Optional snapshots.SnapshotStore. Every
+                checkpoint_interval generations the grid and records so
+                far are saved there; see resume_simulation.
+        sink: Optional sinks.ResultsSink. Records are streamed to it as they
+                are produced instead of being collected, and the returned
+                data list is empty. With detect_cycles, records are held
+                until the run ends because the cycle fields are only
+                known then.
+        profile: Time each phase of the run (see RUN_PHASES). Every record
+                gains 'start_time', 'end_time', 'duration' and
+                '<phase>_seconds' fields; when streaming to a sink they
+                arrive instead as one final record without a generation.
+                The totals are also added to the active
+                profiling.PhaseTimer, if any.
+        census: Count the objects in the final grid (see census.census);
+                every record gains 'still_lifes', 'oscillators',
+                'spaceships' and 'other_objects' fields (delivered to a
+                sink like the profile fields). With detect_cycles the
+                first repeating grid is counted.
+        pattern_cache: census.PatternCache to classify objects through
+                (default: one shared by the whole process).
+        rule: Life-like rule in B/S notation or by name (see
+                rules.get_rule); defaults to Conway's B3/S23. Every record
+                carries it, in canonical form, as 'rule'. Rules other than
+                B3/S23 need the 'lut' or 'block' engine (the default for them).
+        seed: Seed of the initial grid (see initialize_grid); None draws a
+                fresh one. Every record carries it as 'seed', so the
+                initial grid can be regenerated instead of stored.
     """
     # Generate run_id if not provided
-    run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_id = run_id or new_run_id()
+    seed = new_seed() if seed is None else seed
     
-    grid = initialize_grid(rows, cols, prob_of_life)
-    previous_grid = np.copy(grid)
-    data = []
-    # Generate run_id if not provided
-    run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    for gen in range(generations + 1):
-        if gen % log_interval == 0:
-            alive_cells = np.sum(grid)
-            dead_cells = grid.size - alive_cells
-            born_cells = np.sum((previous_grid == 0) & (grid == 1))
-            died_cells = np.sum((previous_grid == 1) & (grid == 0))
-            stability_index = np.sum(grid != previous_grid) / grid.size
-            density = (alive_cells / grid.size) * 100
-            
-            data.append({
-                'run_id': run_id,
-                'grid_size': f"{rows}x{cols}",
-                'probability_of_life': prob_of_life,
-                'total_generations': generations,
-                'generation': gen,
-                'alive_cells': alive_cells,
-                'dead_cells': dead_cells,
-                'born_cells': born_cells,
-                'died_cells': died_cells,
-                'stability_index': stability_index,
-                'density': density
-            })
+    params = {
+        'rows': rows,
+        'cols': cols,
+        'prob_of_life': prob_of_life,
+        'generations': generations,
+        'log_interval': log_interval,
+        'detect_cycles': detect_cycles,
+        'cycle_window': cycle_window,
+        'checkpoint_interval': checkpoint_interval,
+        'profile': profile,
+        'census': census,
+        'rule': get_rule(rule).rulestring,
+        'seed': seed
+    }
+    grid = initialize_grid(rows, cols, prob_of_life, seed)
+    data = _simulate(grid, 0, [], run_id, params, get_engine(engine, rule), checkpoint_store,
+                     sink, pattern_cache)
+    return data, run_id  # Return both data and ID 
+
+def resume_simulation(checkpoint_store, run_id, engine=None, sink=None, pattern_cache=None):
+    """Continue a run_simulation call from its latest checkpoint.
+
+    A cycle search (if enabled) restarts from the checkpoint, so a cycle
+    that began earlier is reported from the first generation seen after
+    resuming.
+
+    Returns:
+        tuple: (data, run_id) as returned by run_simulation
+    """
+    grid, state = checkpoint_store.load_checkpoint(run_id)
+    params = state['params']
+    data = _simulate(grid, state['generation'], state['data'], run_id, params,
+                     get_engine(engine, params.get('rule')), checkpoint_store, sink,
+                     pattern_cache)
+    return data, run_id
+
+def _simulate(grid, start_gen, data, run_id, params, step, checkpoint_store, sink=None,
+              pattern_cache=None):
+    """Step grid from start_gen to the end of the run, logging records.
+
+    grid is the state at start_gen, whose record (if any) is already in data.
+    """
+    rows, cols = params['rows'], params['cols']
+    generations, log_interval = params['generations'], params['log_interval']
+    checkpoint_interval = params['checkpoint_interval']
+    detector = CycleDetector(params['cycle_window']) if params['detect_cycles'] else None
+    timer = PhaseTimer() if params.get('profile') else None
+    phase = timer.phase if timer is not None else null_phase
+    start_time = datetime.now()
+    rulestring = params.get('rule', get_rule().rulestring)
+    
+    def record(gen, stats):
+        return {
+            'run_id': run_id,
+            'grid_size': f"{rows}x{cols}",
+            'probability_of_life': params['prob_of_life'],
+            'total_generations': generations,
+            'generation': gen,
+            **stats,
+            'rule': rulestring,
+            'seed': params.get('seed')
+        }
+    
+    # Records stream straight to the sink unless they still need cycle fields
+    emit = sink.write if sink is not None and detector is None else data.append
+    
+    previous_grid = grid
+    for gen in range(start_gen, generations + 1):
+        if gen > start_gen:
+            previous_grid = grid
+            with phase('step'):
+                grid = step(grid)
         
+        if gen % log_interval == 0 and (gen > start_gen or start_gen == 0):
+            with phase('stats'):
+                stats = generation_stats(grid, previous_grid)
+            with phase('logging'):
+                emit(record(gen, stats))
         
-        previous_grid = np.copy(grid)
-        grid = update_grid(grid)
+        if detector is not None:
+            with phase('cycles'):
+                repeated = detector.observe(gen, grid)
+            if repeated:
+                # From here on the run repeats; fill the rest in from the cycle
+                start, period = detector.stabilization_generation, detector.period
+                with phase('cycles'):
+                    phase_stats = cycle_phase_stats(grid, period, step, generation_stats)
+                first = (gen // log_interval + 1) * log_interval
+                with phase('logging'):
+                    for logged in range(first, generations + 1, log_interval):
+                        emit(record(logged, phase_stats[(logged - start) % period]))
+                break
+        
+        if (checkpoint_store is not None and gen > start_gen
+                and gen % checkpoint_interval == 0 and gen < generations):
+            with phase('io'):
+                checkpoint_store.save_checkpoint(run_id, gen, grid, {
+                    'params': params,
+                    'data': [{k: to_builtin(v) for k, v in row.items()} for row in data]
+                })
     
-    return data, run_id  # Return both data and ID 
+    # Per-run fields that are only known now
+    run_fields = {}
+    if detector is not None:
+        run_fields['period'] = detector.period
+        run_fields['stabilization_generation'] = detector.stabilization_generation
+    if params.get('census'):
+        with phase('census'):
+            run_fields.update(take_census(grid, pattern_cache, rule=rulestring))
+    if timer is not None:
+        end_time = datetime.now()
+        run_fields['start_time'] = start_time.isoformat(timespec='seconds')
+        run_fields['end_time'] = end_time.isoformat(timespec='seconds')
+        run_fields['duration'] = (end_time - start_time).total_seconds()
+        for name in RUN_PHASES:
+            run_fields[f'{name}_seconds'] = timer.totals.get(name, 0.0)
+        outer = active_timer()
+        if outer is not None:
+            outer.merge(timer)
+    for row in data:
+        row.update(run_fields)
+    
+    if sink is not None:
+        if detector is not None:
+            for row in data:
+                sink.write(row)
+            data = []
+        elif run_fields:
+            sink.write({'run_id': run_id, **run_fields})
+    
+    return data
+
+def new_run_id():
+    """Generate a unique run identifier.
 
+    The timestamp keeps IDs sortable; the random suffix keeps runs that
+    start in the same second (e.g. in parallel batches) from colliding.
+    """
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+@timed('io')
 def save_to_csv(data, filename_prefix="game_of_life", run_id=None):
     """Save simulation data to CSV using consistent run_id in filename."""
-    run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_id = run_id or new_run_id()
     filename = f"{filename_prefix}_{run_id}.csv"  # Use the same ID
     
     with open(filename, 'w', newline='') as csvfile:
@@ -223,17 +434,24 @@ def get_prob_of_life():
         except ValueError:
             print("Error: Please enter a valid number")
 
-def get_num_runs():
+def get_num_runs(max_runs=30):
     """Prompt for getting number of simulations run in this batch
-    Returns int: Number of runs (default 5, max 30)"""
+
+    Args:
+        max_runs (int): Upper limit for the prompt; None for no limit
+
+    Returns int: Number of runs (default 5)"""
     while True:
         try:
             user_input = input("Enter the number of runs for this batch (Default = 5): ") 
             if not user_input.strip():
                 return 5 # default value
             num = int(user_input)
-            if 0 < num < 31:
+            if num > 0 and (max_runs is None or num <= max_runs):
                 return num
-            print("Error: please pick a number between 1 and 30")
+            if max_runs is None:
+                print("Error: please pick a number of at least 1")
+            else:
+                print(f"Error: please pick a number between 1 and {max_runs}")
         except ValueError:
-            print("Error:Please enter a valid number")
\ No newline at end of file
+            print("Error:Please enter a valid number")
@@ -0,0 +1,416 @@
+import numpy as np
+import itertools
+import time
+from cycles import grid_hash
+from engines import step_numpy
+from game_of_life_core import initialize_grid, generation_stats, new_run_id
+from rules import CONWAY
+from seeding import new_seed
+
+
+class Node:
+    """Canonical quadtree node.
+
+    A node at level k covers a 2^k x 2^k square. Level 0 nodes are single
+    cells; higher levels hold four children of level k-1. Nodes are
+    created through HashLife.join so identical squares share one object.
+    """
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'pop')
+
+    def __init__(self, level, nw=None, ne=None, sw=None, se=None, pop=0):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.pop = pop
+
+
+class _OverBudget(Exception):
+    """A jump took longer than stepping with NumPy would have."""
+
+
+DEAD = Node(0, pop=0)
+ALIVE = Node(0, pop=1)
+
+
+class BoundedCache(dict):
+    """Dict that trim() cuts back to max_size by evicting its oldest entries.
+
+    Entries are only evicted by trim(), never on insertion, so a
+    computation that is still using its memoized results can't lose them
+    half way. Lookups are plain dict lookups, which keeps the HashLife
+    recursion fast.
+    """
+
+    def __init__(self, max_size):
+        super().__init__()
+        self.max_size = max_size
+
+    def trim(self):
+        """Evict the oldest entries until at most max_size are left."""
+        excess = len(self) - self.max_size
+        if excess > 0:
+            for key in list(itertools.islice(self, excess)):
+                del self[key]
+
+
+def _residues(start, period, level):
+    """Sorted residues (mod period) of the node origins at each level.
+
+    The level-l nodes of a level-`level` window starting at plane
+    coordinate start begin at start + i * 2^l; only their residues matter
+    on a plane tiled with period `period`.
+
+    Returns:
+        list: residues[l] as a sorted int64 array, for l = 0..level
+    """
+    residues = [None] * (level + 1)
+    residues[level] = np.array([start % period], dtype=np.int64)
+    for l in range(level, 0, -1):
+        upper = residues[l]
+        residues[l - 1] = np.union1d(upper, (upper + (1 << (l - 1))) % period)
+    return residues
+
+
+class HashLife:
+    """HashLife engine for a toroidal grid.
+
+    The torus is handled by tiling: the rows x cols board is repeated
+    across the plane, which evolves exactly like the wrapped board. To
+    advance n generations a window of 2^k x 2^k tiled cells is built as
+    a quadtree (with 2^(k-1) >= rows, cols and 2^(k-2) >= n), its centre
+    is advanced n generations with the memoized HashLife recursion, and
+    one tile is read back out of the centre. Between those two
+    conversions the state stays a quadtree, however long the jump.
+
+    Conversions are vectorized level by level, so Python work is done
+    only once per distinct node, and the tiled window is built from the
+    residues of node positions modulo the tile, so a large window costs
+    little more than the tile itself.
+
+    Only the quadrants of the window's centre that overlap the tile are
+    advanced (see _successor_part), not the whole tiled plane.
+
+    Node interning and step results are kept in caches that are trimmed
+    back to max_cache entries after each call to advance(), so memory
+    stays bounded however long the run is. Evicting an entry only costs a
+    recomputation later, never correctness. Whole-tile jumps are cached
+    too, keyed by the board's hash; each holds a full board, so only the
+    last max_tiles are kept.
+
+    Args:
+        max_cache (int): Maximum entries kept in each cache between calls
+        min_jump (int): Jumps of fewer generations than this are stepped
+            directly with the NumPy engine, which is faster for short hops
+        fallback (bool): Give up on a jump once it has taken as long as
+            stepping with NumPy would, and step with NumPy instead. HashLife
+            only pays off once a board has settled into repeating debris;
+            while it is still chaotic this keeps runs within a small
+            multiple of the NumPy time. Results memoized before giving up
+            are kept.
+        max_tiles (int): Maximum whole-tile jump results kept
+    """
+
+    def __init__(self, max_cache=1_000_000, min_jump=16, fallback=True, max_tiles=8):
+        self.min_jump = min_jump
+        self.fallback = fallback
+        self._deadline = None
+        self._misses = 0
+        self._step_seconds = {}
+        self._nodes = BoundedCache(max_cache)
+        self._results = BoundedCache(max_cache)
+        self._tiles = BoundedCache(max_tiles)
+        self._empty = [DEAD]
+
+    def clear(self):
+        """Drop all cached nodes and results."""
+        self._nodes.clear()
+        self._results.clear()
+        self._tiles.clear()
+        self._empty = [DEAD]
+
+    def _trim(self):
+        self._nodes.trim()
+        self._results.trim()
+        self._tiles.trim()
+
+    def join(self, nw, ne, sw, se):
+        """Return the canonical node with the given four children."""
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            node = Node(nw.level + 1, nw, ne, sw, se,
+                        nw.pop + ne.pop + sw.pop + se.pop)
+            self._nodes[key] = node
+        return node
+
+    def empty(self, level):
+        """Return the all-dead node at the given level."""
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self.join(e, e, e, e))
+        return self._empty[level]
+
+    def _life_4x4(self, node):
+        """Advance a level-2 node one generation, returning its 2x2 centre."""
+        cells = [
+            [node.nw.nw.pop, node.nw.ne.pop, node.ne.nw.pop, node.ne.ne.pop],
+            [node.nw.sw.pop, node.nw.se.pop, node.ne.sw.pop, node.ne.se.pop],
+            [node.sw.nw.pop, node.sw.ne.pop, node.se.nw.pop, node.se.ne.pop],
+            [node.sw.sw.pop, node.sw.se.pop, node.se.sw.pop, node.se.se.pop],
+        ]
+        out = []
+        for i in (1, 2):
+            for j in (1, 2):
+                neighbors = sum(
+                    cells[i + di][j + dj]
+                    for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                    if di or dj
+                )
+                if cells[i][j]:
+                    out.append(ALIVE if neighbors in (2, 3) else DEAD)
+                else:
+                    out.append(ALIVE if neighbors == 3 else DEAD)
+        return self.join(*out)
+
+    def _centre(self, node):
+        """Centre of a node (level - 1), not advanced."""
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def successor(self, node, generations):
+        """Centre of node advanced by generations (0 <= generations <= 2^(level-2)).
+
+        The two halves of the classic recursion each advance up to
+        2^(level-3) generations, so any count up to the full speed of the
+        node is reached in one pass.
+
+        Returns:
+            Node: Node of level node.level - 1
+        """
+        if node.pop == 0:
+            return self.empty(node.level - 1)
+        if generations == 0:
+            return self._centre(node)
+        key = (node, generations)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+        self._misses += 1
+        if self._deadline is not None and not self._misses & 1023 \
+                and time.perf_counter() > self._deadline:
+            raise _OverBudget
+
+        if node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            a, b, c, d = node.nw, node.ne, node.sw, node.se
+            join = self.join
+            first = min(generations, 1 << (node.level - 3))
+            second = generations - first
+            c1 = self.successor(a, first)
+            c2 = self.successor(join(a.ne, b.nw, a.se, b.sw), first)
+            c3 = self.successor(b, first)
+            c4 = self.successor(join(a.sw, a.se, c.nw, c.ne), first)
+            c5 = self.successor(join(a.se, b.sw, c.ne, d.nw), first)
+            c6 = self.successor(join(b.sw, b.se, d.nw, d.ne), first)
+            c7 = self.successor(c, first)
+            c8 = self.successor(join(c.ne, d.nw, c.se, d.sw), first)
+            c9 = self.successor(d, first)
+            # The rest on the four overlapping quadrants (just their
+            # centres when nothing is left)
+            result = join(
+                self.successor(join(c1, c2, c4, c5), second),
+                self.successor(join(c2, c3, c5, c6), second),
+                self.successor(join(c4, c5, c7, c8), second),
+                self.successor(join(c5, c6, c8, c9), second),
+            )
+
+        self._results[key] = result
+        return result
+
+    def _successor_part(self, node, generations, rows, cols):
+        """successor(), correct only in the top-left rows x cols of the result.
+
+        The rest is left dead and the result isn't cached. Quadrants of
+        the result outside the area aren't computed, nor are the
+        first-phase results only they would read; the ones that are read
+        come from successor() whole, so they stay real, cacheable nodes.
+        """
+        size = 1 << (node.level - 1)
+        if rows <= 0 or cols <= 0 or node.pop == 0:
+            return self.empty(node.level - 1)
+        if (rows >= size and cols >= size) or node.level == 2 or generations == 0:
+            return self.successor(node, generations)
+
+        a, b, c, d = node.nw, node.ne, node.sw, node.se
+        join = self.join
+        first = min(generations, 1 << (node.level - 3))
+        second = generations - first
+        half = size // 2
+        subnodes = [
+            [a, join(a.ne, b.nw, a.se, b.sw), b],
+            [join(a.sw, a.se, c.nw, c.ne), join(a.se, b.sw, c.ne, d.nw),
+             join(b.sw, b.se, d.nw, d.ne)],
+            [c, join(c.ne, d.nw, c.se, d.sw), d],
+        ]
+        # Quadrant (qi, qj) of the result reads first-phase results
+        # qi..qi+1 x qj..qj+1
+        needed_rows = 3 if rows > half else 2
+        needed_cols = 3 if cols > half else 2
+        results = [[self.successor(subnodes[i][j], first) for j in range(needed_cols)]
+                   for i in range(needed_rows)]
+
+        quadrants = []
+        for qi in range(2):
+            for qj in range(2):
+                q_rows, q_cols = min(rows - qi * half, half), min(cols - qj * half, half)
+                if q_rows <= 0 or q_cols <= 0:
+                    quadrants.append(self.empty(node.level - 2))
+                    continue
+                inner = join(results[qi][qj], results[qi][qj + 1],
+                             results[qi + 1][qj], results[qi + 1][qj + 1])
+                quadrants.append(self._successor_part(inner, second, q_rows, q_cols))
+        return join(*quadrants)
+
+    def build_tiled(self, tile, level, offset):
+        """Build a node of the plane tiled with tile.
+
+        Window cell (y, x) holds tile[(y - offset) % rows, (x - offset) % cols].
+        """
+        rows, cols = tile.shape
+        row_residues = _residues(-offset, rows, level)
+        col_residues = _residues(-offset, cols, level)
+
+        # ids[i, j] indexes nodes for the node whose origin has residues
+        # (row_residues[l][i], col_residues[l][j])
+        nodes = [DEAD, ALIVE]
+        ids = (tile[np.ix_(row_residues[0], col_residues[0])] != 0).astype(np.int64)
+        for l in range(1, level + 1):
+            half = 1 << (l - 1)
+            r, c = row_residues[l], col_residues[l]
+            top = np.searchsorted(row_residues[l - 1], r)
+            bottom = np.searchsorted(row_residues[l - 1], (r + half) % rows)
+            left = np.searchsorted(col_residues[l - 1], c)
+            right = np.searchsorted(col_residues[l - 1], (c + half) % cols)
+            quads = [ids[np.ix_(ys, xs)].ravel() for ys in (top, bottom) for xs in (left, right)]
+
+            # Number the distinct quadruples of children with two pairings
+            n = len(nodes)
+            _, upper = np.unique(quads[0] * n + quads[1], return_inverse=True)
+            _, lower = np.unique(quads[2] * n + quads[3], return_inverse=True)
+            _, first, inverse = np.unique(upper * (lower.max() + 1) + lower,
+                                          return_index=True, return_inverse=True)
+            nodes = [self.join(nodes[nw], nodes[ne], nodes[sw], nodes[se])
+                     for nw, ne, sw, se in zip(*(quad[first].tolist() for quad in quads))]
+            ids = inverse.reshape(r.size, c.size)
+        return nodes[ids[0, 0]]
+
+    def to_array(self, node, rows, cols, dtype):
+        """Read the top-left rows x cols cells of node into an array."""
+        nodes = [node]
+        ids = np.zeros((1, 1), dtype=np.int64)
+        for level in range(node.level, 0, -1):
+            # Number the children of the distinct nodes at this level
+            numbering, children = {}, []
+            for n in nodes:
+                for child in (n.nw, n.ne, n.sw, n.se):
+                    children.append(numbering.setdefault(child, len(numbering)))
+            children = np.array(children, dtype=np.int64).reshape(-1, 2, 2)
+
+            # Expand to the child level, keeping only what covers the output
+            size = 1 << (level - 1)
+            expanded = children[ids].transpose(0, 2, 1, 3).reshape(2 * ids.shape[0], -1)
+            expanded = expanded[:-(-rows // size), :-(-cols // size)]
+            order = list(numbering)
+            used, ids = np.unique(expanded, return_inverse=True)
+            ids = ids.reshape(expanded.shape)
+            nodes = [order[i] for i in used]
+        return np.array([n.pop for n in nodes], dtype=dtype)[ids]
+
+    def _step(self, grid, generations):
+        """Step with NumPy, keeping a per-shape estimate of the time per step."""
+        started = time.perf_counter()
+        for _ in range(generations):
+            grid = step_numpy(grid)
+        if generations:
+            self._step_seconds[grid.shape] = (time.perf_counter() - started) / generations
+        return grid
+
+    def advance(self, grid, generations):
+        """Advance a toroidal grid by any number of generations."""
+        if generations < self.min_jump:
+            return self._step(grid, generations)
+
+        rows, cols = grid.shape
+        key = (grid_hash(grid), grid.shape, grid.dtype.str, generations)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            return cached.copy()
+
+        if self.fallback:
+            if grid.shape not in self._step_seconds:
+                self._step(grid, 2)  # warm up the estimate (the result is unused)
+            self._deadline = time.perf_counter() + generations * self._step_seconds[grid.shape]
+        try:
+            # Centre (level k-1) must hold a whole tile, and generations <= 2^(k-2)
+            level = max((generations - 1).bit_length() + 2,
+                        int(max(rows, cols) - 1).bit_length() + 1, 3)
+            offset = 1 << (level - 2)
+            window = self.build_tiled(grid, level, offset)
+            centre = self._successor_part(window, generations, rows, cols)
+            result = self.to_array(centre, rows, cols, grid.dtype)
+            self._tiles[key] = result.copy()
+        except _OverBudget:
+            result = self._step(grid, generations)
+        finally:
+            self._deadline = None
+            self._trim()
+        return result
+
+    def jump(self, grid, j):
+        """Advance a toroidal grid by exactly 2^j generations."""
+        return self.advance(grid, 1 << j)
+
+
+def run_hashlife_simulation(rows=100, cols=150, prob_of_life=0.1, generations=1000,
+                            log_interval=100, run_id=None, max_cache=1_000_000, seed=None):
+    """Run the simulation with HashLife, jumping between logged generations.
+
+    Only the generations that run_simulation logs (and the one before each,
+    for born/died counts) are materialized, so cost grows with the number
+    of log points and the variety of patterns, not with generations.
+    Returns records in the same format as run_simulation.
+
+    Args:
+        seed (int): Seed of the initial grid; None draws a fresh one
+
+    Returns:
+        tuple: (data, run_id)
+    """
+    run_id = run_id or new_run_id()
+    seed = new_seed() if seed is None else seed
+
+    engine = HashLife(max_cache=max_cache)
+    grid = initialize_grid(rows, cols, prob_of_life, seed)
+    previous_grid = grid
+    data = []
+    current = 0
+
+    for gen in range(0, generations + 1, log_interval):
+        if gen > 0:
+            previous_grid = engine.advance(grid, gen - 1 - current)
+            grid = step_numpy(previous_grid)
+            current = gen
+        data.append({
+            'run_id': run_id,
+            'grid_size': f"{rows}x{cols}",
+            'probability_of_life': prob_of_life,
+            'total_generations': generations,
+            'generation': gen,
+            **generation_stats(grid, previous_grid),
+            'rule': CONWAY,
+            'seed': seed
+        })
+
+    return data, run_id
@@ -0,0 +1,135 @@
+import functools
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Timer that module-level phase() and @timed report to, if any
+_active_timer = ContextVar("active_timer", default=None)
+
+# Shared do-nothing context returned while profiling is off
+_NO_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+
+
+class PhaseTimer:
+    """Accumulates wall-clock time and call counts per named phase.
+
+    Use timer.phase(name) as a context manager around the code to
+    measure, or activate the timer with profiling(timer) so that
+    module-level phase() blocks and @timed functions report to it.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add(self, name, seconds, calls=1):
+        self.totals[name] += seconds
+        self.calls[name] += calls
+
+    def merge(self, other):
+        """Add another timer's totals to this one."""
+        for name, seconds in other.totals.items():
+            self.add(name, seconds, other.calls[name])
+
+    def summary(self):
+        """Text table of phases by total time, largest first."""
+        total = sum(self.totals.values()) or 1.0
+        lines = [f"{'phase':<12} {'seconds':>10} {'share':>7} {'calls':>10}"]
+        for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<12} {seconds:>10.4f} {seconds / total:>7.1%} "
+                         f"{self.calls[name]:>10}")
+        return "\n".join(lines)
+
+
+def active_timer():
+    """The timer activated by the innermost profiling() block, or None."""
+    return _active_timer.get()
+
+
+def null_phase(name):
+    """Stand-in for PhaseTimer.phase when timing is off."""
+    return _NO_PHASE
+
+
+def phase(name):
+    """Time a block against the active timer (a no-op when there is none)."""
+    timer = _active_timer.get()
+    return timer.phase(name) if timer is not None else _NO_PHASE
+
+
+def timed(name):
+    """Decorator form of phase(): time every call of the function."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = _active_timer.get()
+            if timer is None:
+                return func(*args, **kwargs)
+            with timer.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profiling(timer=None):
+    """Make timer (default: a new PhaseTimer) the active timer for the block.
+
+    Yields:
+        PhaseTimer: The active timer
+    """
+    timer = timer if timer is not None else PhaseTimer()
+    token = _active_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _active_timer.reset(token)
+
+
+@contextmanager
+def sampling_profiler(output=None, interval=0.001):
+    """Run the block under the pyinstrument sampling profiler.
+
+    pyinstrument is optional and only imported here. The report is
+    written as HTML if output ends in .html, as text otherwise, or
+    printed when output is None.
+
+    Args:
+        output (str): Report file
+        interval (float): Seconds between samples
+    """
+    try:
+        from pyinstrument import Profiler
+    except ImportError as e:
+        raise ImportError("The sampling profiler needs pyinstrument (pip install pyinstrument)") from e
+
+    profiler = Profiler(interval=interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if output is None:
+            print(profiler.output_text())
+        else:
+            with open(output, "w") as f:
+                f.write(profiler.output_html() if output.endswith(".html") else profiler.output_text())
@@ -0,0 +1,170 @@
+import os
+import queue
+import threading
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.animation as animation
+from matplotlib.figure import Figure
+from engines import get_engine
+
+
+class FrameProducer:
+    """Steps a grid ahead in a background thread and queues frames to draw.
+
+    The simulation runs at its own pace instead of once per animation
+    callback; only every k-th generation is copied into the bounded frame
+    queue as a uint8 array, and the producer waits when the display falls
+    queue_size frames behind.
+
+    Args:
+        initial_grid (np.ndarray): Starting grid (1=alive, 0=dead)
+        generations (int): Number of steps to take
+        engine (str or callable): Stepping engine (see engines.ENGINES)
+        every (int): Queue every k-th generation (the last one always)
+        queue_size (int): Maximum frames waiting to be drawn
+        on_generation (callable): Called in the producer thread as
+            on_generation(frame_num, grid, new_grid) after every step,
+            where frame_num counts steps from 0. Use it for logging,
+            which then happens for every generation, drawn or not.
+    """
+
+    _DONE = object()
+
+    def __init__(self, initial_grid, generations, engine=None, every=1, queue_size=32,
+                 on_generation=None):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.initial_grid = initial_grid
+        self.generations = generations
+        self.step = get_engine(engine)
+        self.every = every
+        self.on_generation = on_generation
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="FrameProducer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        # Time out now and then so stop() is noticed while the queue is full
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _run(self):
+        try:
+            grid = self.initial_grid.copy()
+            for frame_num in range(self.generations):
+                if self._stop.is_set():
+                    break
+                new_grid = self.step(grid)
+                if self.on_generation is not None:
+                    self.on_generation(frame_num, grid, new_grid)
+                if frame_num % self.every == 0 or frame_num == self.generations - 1:
+                    self._put((frame_num, np.array(new_grid, dtype=np.uint8)))
+                grid = new_grid
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._put(self._DONE)
+
+    def frames(self):
+        """Yield (frame_num, uint8 frame) pairs until the run is over.
+
+        Raises:
+            RuntimeError: If stepping or on_generation failed
+        """
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                break
+            yield item
+        if self._error is not None:
+            raise RuntimeError("Frame producer failed") from self._error
+
+    def stop(self):
+        """Stop stepping (e.g. when the window is closed early)."""
+        self._stop.set()
+        self._thread.join()
+
+
+def _draw_setup(fig, first_frame):
+    """imshow artist and generation label, fixed to a 0/1 color scale."""
+    ax = fig.add_subplot()
+    img = ax.imshow(first_frame, interpolation='nearest', cmap='binary', vmin=0, vmax=1)
+    text = ax.text(0.02, 0.95, '', transform=ax.transAxes, color='red')
+    return img, text
+
+
+def play(producer, interval=100):
+    """Show a producer's frames in a window as they arrive.
+
+    Blocks until the window is closed or the run ends.
+
+    Returns:
+        matplotlib.animation.FuncAnimation
+    """
+    fig = plt.figure()
+    img, text = _draw_setup(fig, producer.initial_grid)
+    last_frame = producer.generations - 1
+
+    def init():
+        return img, text
+
+    def update_frame(item):
+        frame_num, frame = item
+        img.set_data(frame)
+        text.set_text(f'Gen: {frame_num}')
+        if frame_num == last_frame:
+            plt.close(fig)
+        return img, text
+
+    ani = animation.FuncAnimation(
+        fig,
+        update_frame,
+        frames=producer.start().frames(),
+        init_func=init,
+        interval=interval,
+        blit=True,
+        repeat=False,
+        cache_frame_data=False
+    )
+    try:
+        plt.show()
+    finally:
+        producer.stop()
+    return ani
+
+
+def export(producer, path, fps=30, dpi=100):
+    """Encode a producer's frames to a video or GIF without opening a window.
+
+    The format follows the file extension: .gif uses Pillow, anything
+    else (.mp4, .webm, ...) needs ffmpeg on the PATH.
+
+    Returns:
+        str: path
+    """
+    fig = Figure()  # not registered with pyplot, so no GUI backend is involved
+    img, text = _draw_setup(fig, producer.initial_grid)
+    if os.path.splitext(path)[1].lower() == '.gif':
+        writer = animation.PillowWriter(fps=fps)
+    else:
+        writer = animation.FFMpegWriter(fps=fps)
+
+    with writer.saving(fig, path, dpi):
+        writer.grab_frame()  # the initial grid
+        try:
+            for frame_num, frame in producer.start().frames():
+                img.set_data(frame)
+                text.set_text(f'Gen: {frame_num}')
+                writer.grab_frame()
+        finally:
+            producer.stop()
+    return path
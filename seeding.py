@@ -0,0 +1,167 @@
+import argparse
+import sqlite3
+import numpy as np
+from DataBase import get_db_path
+
+# Seeds are kept to 63 bits so they fit the runs.seed column (a signed
+# 64-bit SQLite INTEGER)
+SEED_BITS = 63
+
+# Cells drawn per chunk when no chunk size is given
+DEFAULT_CHUNK_CELLS = 1 << 22
+
+
+def new_seed(seed_seq=None):
+    """A run seed drawn from a SeedSequence (fresh OS entropy by default).
+
+    Returns:
+        int: Non-negative seed of at most SEED_BITS bits
+    """
+    if seed_seq is None:
+        seed_seq = np.random.SeedSequence()
+    return int(seed_seq.generate_state(1, dtype=np.uint64)[0] >> np.uint64(64 - SEED_BITS))
+
+
+def spawn_seeds(root_seed, count):
+    """Seeds for count runs with independent streams, spawned from one root.
+
+    Args:
+        root_seed (int): Root entropy; None draws fresh entropy
+        count (int): Number of seeds
+
+    Returns:
+        list: count ints, as from new_seed
+    """
+    return [new_seed(child) for child in np.random.SeedSequence(root_seed).spawn(count)]
+
+
+def _chunk_rows(cols, chunk_rows):
+    if chunk_rows is None:
+        chunk_rows = max(DEFAULT_CHUNK_CELLS // max(cols, 1), 1)
+    # Keep every chunk but the last an even number of cells, so chunks
+    # use whole 64-bit words and no half word is carried between them
+    return chunk_rows + (chunk_rows * cols) % 2
+
+
+def random_rows(rows, cols, prob_of_life, seed, chunk_rows=None, start=0, stop=None):
+    """Draw a random grid (or a band of its rows) a block of rows at a time.
+
+    Cells come from a PCG64 generator seeded with seed, two cells per
+    64-bit output: each 32-bit half is compared against prob_of_life
+    scaled to 2**32. Cell i of the flattened grid always comes from half
+    i % 2 of output i // 2, so the cells depend only on (rows, cols,
+    prob_of_life, seed), not on chunk_rows or the platform, and a band
+    of rows can be drawn on its own by jumping the generator ahead. A
+    grid can always be regenerated from its seed.
+
+    Args:
+        seed (int): Run seed (see new_seed)
+        chunk_rows (int): Rows per block (default: about 4M cells)
+        start, stop (int): Only draw rows start:stop (default: all rows)
+
+    Yields:
+        tuple: (start_row, stop_row, bool array of shape (stop - start, cols))
+    """
+    if not 0.0 <= prob_of_life <= 1.0:
+        raise ValueError("prob_of_life must be between 0.0 and 1.0")
+    stop = rows if stop is None else min(stop, rows)
+    bit_generator = np.random.PCG64(np.random.SeedSequence(seed))
+    threshold = round(prob_of_life * 2**32)
+    chunk_rows = _chunk_rows(cols, chunk_rows)
+
+    first_cell = int(start) * cols
+    bit_generator.advance(first_cell // 2)
+    # Little-endian halves: the same cells on every platform
+    carry = _halves(bit_generator.random_raw(1))[1:] if first_cell % 2 else None
+    for block_start in range(start, stop, chunk_rows):
+        block_stop = min(block_start + chunk_rows, stop)
+        cells = (block_stop - block_start) * cols
+        if carry is None:
+            halves = _halves(bit_generator.random_raw(-(-cells // 2)))
+        else:
+            halves = np.concatenate((carry, _halves(bit_generator.random_raw(-(-(cells - 1) // 2)))))
+        halves, carry = halves[:cells], (halves[cells:] if halves.size > cells else None)
+        if threshold >= 2**32:
+            alive = np.ones(cells, dtype=bool)
+        else:
+            alive = halves < np.uint32(threshold)
+        yield block_start, block_stop, alive.reshape(block_stop - block_start, cols)
+
+
+def _halves(words):
+    return words.astype('<u8', copy=False).view('<u4')
+
+
+def random_grid(rows, cols, prob_of_life, seed, dtype=np.uint8, chunk_rows=None, out=None):
+    """Random grid written straight into a compact array.
+
+    Args:
+        dtype: Cell dtype (uint8 or bool are the compact choices)
+        out (np.ndarray): Optional (rows, cols) array to fill instead,
+            e.g. a memory map from np.lib.format.open_memmap
+
+    Returns:
+        np.ndarray: The grid (out, if given)
+    """
+    if out is None:
+        out = np.empty((rows, cols), dtype=dtype)
+    for start, stop, alive in random_rows(rows, cols, prob_of_life, seed, chunk_rows):
+        out[start:stop] = alive
+    return out
+
+
+def random_grid_file(path, rows, cols, prob_of_life, seed, packed=False, chunk_rows=None):
+    """Write a random grid to a .npy file one block at a time.
+
+    Only one block is in memory at once, so the board can be larger than
+    RAM. Packed files hold np.packbits(grid, axis=1) (8 cells per byte,
+    as in snapshots.SnapshotStore); unpacked ones hold uint8 cells.
+
+    Returns:
+        np.memmap: The file, memory-mapped
+    """
+    shape = (rows, -(-cols // 8)) if packed else (rows, cols)
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=shape)
+    for start, stop, alive in random_rows(rows, cols, prob_of_life, seed, chunk_rows):
+        out[start:stop] = np.packbits(alive, axis=1) if packed else alive
+    out.flush()
+    return out
+
+
+def run_parameters(run_id, db_path=None):
+    """(rows, cols, probability_of_life, seed) of a stored run.
+
+    Raises:
+        ValueError: If the run is unknown or was stored without a seed
+    """
+    conn = sqlite3.connect(db_path or get_db_path())
+    try:
+        row = conn.execute(
+            "SELECT rows, cols, probability_of_life, seed FROM runs WHERE run_id = ?",
+            (run_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise ValueError(f"Unknown run '{run_id}'")
+    if None in row:
+        raise ValueError(f"Run '{run_id}' has no seed or grid parameters recorded")
+    return row
+
+
+def run_initial_grid(run_id, db_path=None, dtype=np.uint8):
+    """Regenerate a stored run's initial grid from its recorded seed."""
+    rows, cols, prob_of_life, seed = run_parameters(run_id, db_path)
+    return random_grid(rows, cols, prob_of_life, seed, dtype=dtype)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the initial grid of a stored run.")
+    parser.add_argument("run_id")
+    parser.add_argument("output", help=".npy file to write")
+    parser.add_argument("--packed", action="store_true", help="Store 8 cells per byte")
+    args = parser.parse_args()
+
+    rows, cols, prob_of_life, seed = run_parameters(args.run_id)
+    random_grid_file(args.output, rows, cols, prob_of_life, seed, packed=args.packed)
+    print(f"Wrote the {rows}x{cols} initial grid of {args.run_id} to {args.output}")
@@ -0,0 +1,206 @@
+import os
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from engines import apply_rule, count_neighbors_padded
+from game_of_life_core import new_run_id
+from rules import CONWAY
+from seeding import new_seed, random_rows
+
+# Per-strip statistics gathered at each logged generation
+STAT_FIELDS = ('alive', 'born', 'died')
+
+
+def _strip_bounds(rows, workers):
+    """Split rows into contiguous, nearly equal horizontal strips."""
+    edges = np.linspace(0, rows, workers + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _step_strip(src, dst, r0, r1, chunk_rows):
+    """Write the next generation of rows [r0, r1) of src into dst.
+
+    The one-row halos above and below the strip are read straight from
+    the neighboring strips in shared memory (wrapping at the edges), so
+    the halo swap costs nothing beyond the barrier that separates
+    generations.
+    """
+    rows = src.shape[0]
+    for c0 in range(r0, r1, chunk_rows):
+        c1 = min(c0 + chunk_rows, r1)
+        block = src.take(np.arange(c0 - 1, c1 + 1) % rows, axis=0)
+        padded = np.pad(block, ((0, 0), (1, 1)), mode='wrap')
+        dst[c0:c1] = apply_rule(src[c0:c1], count_neighbors_padded(padded))
+
+
+def _strip_stats(grid, previous, r0, r1):
+    cur = grid[r0:r1]
+    prev = previous[r0:r1]
+    alive = np.count_nonzero(cur)
+    born = np.count_nonzero(cur > prev)
+    died = np.count_nonzero(cur < prev)
+    return alive, born, died
+
+
+def _worker(index, bounds, shape, grid_names, stats_name, n_logs, workers, generations,
+            log_interval, barrier, prob_of_life, seed, chunk_rows):
+    """Worker process: owns one horizontal strip for the whole run."""
+    r0, r1 = bounds
+    handles = [shared_memory.SharedMemory(name=name) for name in grid_names + [stats_name]]
+    try:
+        buffers = [np.ndarray(shape, dtype=np.uint8, buffer=h.buf) for h in handles[:2]]
+        stats = np.ndarray((n_logs, workers, len(STAT_FIELDS)),
+                           dtype=np.int64, buffer=handles[2].buf)
+
+        # Each worker draws its own strip: the same rows initialize_grid
+        # would give for this seed, whatever the number of workers
+        if seed is not None:
+            for c0, c1, alive in random_rows(shape[0], shape[1], prob_of_life, seed,
+                                             chunk_rows, start=r0, stop=r1):
+                buffers[0][c0:c1] = alive
+        barrier.wait()
+
+        stats[0, index] = (np.count_nonzero(buffers[0][r0:r1]), 0, 0)
+        for gen in range(1, generations + 1):
+            src, dst = buffers[(gen - 1) % 2], buffers[gen % 2]
+            _step_strip(src, dst, r0, r1, chunk_rows)
+            if gen % log_interval == 0:
+                stats[gen // log_interval, index] = _strip_stats(dst, src, r0, r1)
+            # Nobody may overwrite src until every strip has read its halos
+            barrier.wait()
+    except BaseException:
+        barrier.abort()  # release the other workers instead of deadlocking
+        raise
+    finally:
+        for h in handles:
+            h.close()
+
+
+class SharedGrid:
+    """Double-buffered uint8 grid in shared memory, split into row strips.
+
+    Use as a context manager so the shared segments are always released.
+
+    Args:
+        rows, cols (int): Grid dimensions
+        workers (int): Number of worker processes / strips
+    """
+
+    def __init__(self, rows, cols, workers=None):
+        self.shape = (rows, cols)
+        self.workers = min(workers or os.cpu_count(), rows)
+        nbytes = rows * cols
+        self._segments = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(2)]
+        self.buffers = [np.ndarray(self.shape, dtype=np.uint8, buffer=s.buf) for s in self._segments]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.buffers = []
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+    def run(self, generations, log_interval, initial_grid=None, prob_of_life=0.1,
+            seed=None, chunk_rows=256):
+        """Step the grid in parallel and collect per-strip statistics.
+
+        Args:
+            initial_grid (np.ndarray): Starting grid; if None every worker
+                fills its own strip randomly with prob_of_life
+            seed (int): Seed of the random fill (see seeding.random_rows);
+                the grid equals initialize_grid's for the same seed. None
+                draws a fresh one.
+
+        Returns:
+            tuple: (stats, final_grid) where stats has shape
+                (logged generations, workers, len(STAT_FIELDS)) and
+                final_grid is a copy of the last generation
+        """
+        n_logs = generations // log_interval + 1
+        stats_segment = shared_memory.SharedMemory(
+            create=True, size=max(1, n_logs * self.workers * len(STAT_FIELDS) * 8))
+        try:
+            if initial_grid is not None:
+                self.buffers[0][:] = initial_grid
+                seed = None
+            elif seed is None:
+                seed = new_seed()
+
+            barrier = mp.Barrier(self.workers)
+            grid_names = [s.name for s in self._segments]
+            processes = [
+                mp.Process(target=_worker, args=(
+                    i, bounds, self.shape, grid_names, stats_segment.name, n_logs,
+                    self.workers, generations, log_interval, barrier, prob_of_life, seed, chunk_rows))
+                for i, bounds in enumerate(_strip_bounds(self.shape[0], self.workers))
+            ]
+            for p in processes:
+                p.start()
+            for p in processes:
+                p.join()
+            if any(p.exitcode != 0 for p in processes):
+                raise RuntimeError("A shared-grid worker failed; see its traceback above.")
+
+            stats = np.ndarray((n_logs, self.workers, len(STAT_FIELDS)), dtype=np.int64,
+                               buffer=stats_segment.buf).copy()
+            return stats, self.buffers[generations % 2].copy()
+        finally:
+            stats_segment.close()
+            stats_segment.unlink()
+
+
+def run_shared_simulation(rows=100, cols=150, prob_of_life=0.1, generations=1000,
+                          log_interval=100, run_id=None, workers=None, seed=None,
+                          initial_grid=None):
+    """Run one large simulation split across worker processes.
+
+    The grid lives in shared memory and each worker steps one horizontal
+    strip, reading its neighbors' edge rows as halos. Per-strip
+    statistics are reduced into the same records run_simulation returns.
+
+    Args:
+        workers (int): Worker processes (default: CPU count)
+        seed (int): Seed of the initial grid, as for run_simulation; None
+            draws a fresh one. Records carry it as 'seed' (None with an
+            initial_grid).
+        initial_grid (np.ndarray): Optional starting grid instead of a
+            random fill
+
+    Returns:
+        tuple: (data, run_id)
+    """
+    run_id = run_id or new_run_id()
+    if initial_grid is not None:
+        seed = None
+    elif seed is None:
+        seed = new_seed()
+
+    with SharedGrid(rows, cols, workers) as shared:
+        stats, _ = shared.run(generations, log_interval, initial_grid=initial_grid,
+                              prob_of_life=prob_of_life, seed=seed)
+
+    size = rows * cols
+    data = []
+    for i, (alive_cells, born_cells, died_cells) in enumerate(stats.sum(axis=1)):
+        data.append({
+            'run_id': run_id,
+            'grid_size': f"{rows}x{cols}",
+            'probability_of_life': prob_of_life,
+            'total_generations': generations,
+            'generation': i * log_interval,
+            'alive_cells': alive_cells,
+            'dead_cells': size - alive_cells,
+            'born_cells': born_cells,
+            'died_cells': died_cells,
+            'stability_index': (born_cells + died_cells) / size,
+            'density': (alive_cells / size) * 100,
+            'rule': CONWAY,
+            'seed': seed
+        })
+    return data, run_id
@@ -0,0 +1,174 @@
+import csv
+import os
+import queue
+import sqlite3
+import threading
+from DataBase import FLAT_COLUMNS, RUN_COLUMNS, create_tables, get_db_path, insert_records, to_builtin
+from columnar import ColumnarStore
+
+
+class ResultsSink:
+    """Destination for per-generation records from a simulation.
+
+    Subclasses implement write(record) and may override close(). Sinks
+    are context managers, so `with SQLiteSink() as sink:` always flushes.
+    """
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ListSink(ResultsSink):
+    """Collects records in memory (what run_simulation returns by default)."""
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+
+class CsvSink(ResultsSink):
+    """Streams records to a CSV file in the same format as save_to_csv.
+
+    The columns are FLAT_COLUMNS followed by the RUN_COLUMNS, so every
+    field a run can record has a place. Run fields that arrive after the
+    generations of a streamed run (timings, census counts) come in a
+    record without a generation; they are filled into the run's rows
+    already written, by rewriting the file once, rather than added as a
+    row of their own.
+    """
+
+    FIELDS = FLAT_COLUMNS + tuple(c for c in RUN_COLUMNS if c not in FLAT_COLUMNS)
+
+    def __init__(self, run_id, filename_prefix="game_of_life", filename=None):
+        self.filename = filename or f"{filename_prefix}_{run_id}.csv"
+        self._run_fields = {}
+        self._file = open(self.filename, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.FIELDS)
+        self._writer.writeheader()
+
+    def write(self, record):
+        run_id = record.get('run_id')
+        if record.get('generation') is None:
+            fields = {key: value for key, value in record.items()
+                      if key in RUN_COLUMNS and value is not None}
+            self._run_fields.setdefault(run_id, {}).update(fields)
+            self._fill(run_id, fields)
+            return
+        self._writer.writerow({**record, **self._run_fields.get(run_id, {})})
+
+    def _fill(self, run_id, fields):
+        """Rewrite the file with fields set on the rows of run_id."""
+        self._file.close()
+        tmp_path = f"{self.filename}.tmp"
+        with open(self.filename, newline='') as source, open(tmp_path, 'w', newline='') as target:
+            writer = csv.DictWriter(target, fieldnames=self.FIELDS)
+            writer.writeheader()
+            for row in csv.DictReader(source):
+                if row['run_id'] == str(run_id):
+                    row.update(fields)
+                writer.writerow(row)
+        os.replace(tmp_path, self.filename)
+        self._file = open(self.filename, 'a', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.FIELDS)
+
+    def close(self):
+        self._file.close()
+
+
+class ColumnarSink(ResultsSink):
+    """Appends records to a columnar store (see columnar.ColumnarStore).
+
+    Rows are written in chunks of chunk_rows and memory-mappable as soon
+    as each chunk is flushed.
+    """
+
+    def __init__(self, root, chunk_rows=4096):
+        self.store = ColumnarStore(root, chunk_rows=chunk_rows)
+
+    def write(self, record):
+        self.store.append([record])
+
+    def close(self):
+        self.store.close()
+
+
+class SQLiteSink(ResultsSink):
+    """Streams records into the runs and generations tables from a background thread.
+
+    write() only puts the record on a bounded queue; a writer thread owns the
+    SQLite connection and inserts rows with executemany, committing every
+    batch_size rows or whenever the queue runs dry. The stepping loop is
+    only held up if the writer falls queue_size rows behind. One sink can
+    be shared by all the runs of a batch.
+
+    Args:
+        db_path (str): Database file (default: $GAME_OF_LIFE_DB/game_of_life.db)
+        batch_size (int): Rows per transaction
+        queue_size (int): Maximum rows waiting to be written
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path=None, batch_size=1000, queue_size=10000):
+        self.db_path = db_path or get_db_path()
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="SQLiteSink", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        if self._error is not None:
+            raise RuntimeError("SQLite writer thread failed") from self._error
+        self._queue.put({key: to_builtin(value) for key, value in record.items()})
+
+    def close(self):
+        """Flush all queued rows and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("SQLite writer thread failed") from self._error
+
+    def _run(self):
+        done = False
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            create_tables(conn)
+            try:
+                run_id = None  # carried for records that leave run_id empty
+                while not done:
+                    batch = [self._queue.get()]
+                    # Drain whatever else is waiting, up to one batch
+                    while len(batch) < self.batch_size:
+                        try:
+                            batch.append(self._queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    if batch[-1] is self._STOP:
+                        batch.pop()
+                        done = True
+                    with conn:
+                        run_id = insert_records(conn, batch, run_id)
+            finally:
+                conn.close()
+        except BaseException as e:
+            self._error = e
+            # Keep draining so producers never block on a dead writer,
+            # unless the batch that failed already held close()'s _STOP
+            while not done:
+                if self._queue.get() is self._STOP:
+                    break
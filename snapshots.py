@@ -0,0 +1,130 @@
+import json
+import os
+import re
+import numpy as np
+from DataBase import to_builtin
+
+_SNAPSHOT_RE = re.compile(r"gen_(\d+)\.npy$")
+
+
+def _atomic_write_json(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    """Directory of grid snapshots keyed by run ID and generation.
+
+    Each snapshot is a plain .npy file, so it can be memory-mapped and
+    read without copying. With packed=True cells are stored 8 per byte
+    (np.packbits along rows) and unpacked on read; with packed=False the
+    uint8 grid itself is stored and read back as a zero-copy view.
+
+    Layout::
+
+        root/<run_id>/meta.json          grid shape and format
+        root/<run_id>/gen_0000001000.npy snapshot of generation 1000
+        root/<run_id>/checkpoint.json    latest resumable checkpoint
+
+    Args:
+        root (str): Directory holding the store
+        packed (bool): Store 1 bit per cell instead of 1 byte
+    """
+
+    def __init__(self, root, packed=True):
+        self.root = root
+        self.packed = packed
+        os.makedirs(root, exist_ok=True)
+
+    def _run_dir(self, run_id):
+        return os.path.join(self.root, str(run_id))
+
+    def _snapshot_path(self, run_id, generation):
+        return os.path.join(self._run_dir(run_id), f"gen_{generation:010d}.npy")
+
+    def _meta(self, run_id):
+        with open(os.path.join(self._run_dir(run_id), "meta.json")) as f:
+            return json.load(f)
+
+    def save(self, run_id, generation, grid):
+        """Write a snapshot of grid for (run_id, generation).
+
+        Returns:
+            str: Path of the snapshot file
+        """
+        run_dir = self._run_dir(run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        meta_path = os.path.join(run_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            _atomic_write_json(meta_path, {
+                'rows': grid.shape[0],
+                'cols': grid.shape[1],
+                'dtype': grid.dtype.str,
+                'packed': self.packed,
+            })
+
+        cells = grid.astype(bool, copy=False)
+        payload = np.packbits(cells, axis=1) if self.packed else cells.view(np.uint8)
+        path = self._snapshot_path(run_id, generation)
+        tmp_path = path[:-len(".npy")] + ".tmp.npy"
+        np.save(tmp_path, payload)
+        os.replace(tmp_path, path)
+        return path
+
+    def generations(self, run_id):
+        """Sorted list of saved generations for a run."""
+        run_dir = self._run_dir(run_id)
+        if not os.path.isdir(run_dir):
+            return []
+        found = (_SNAPSHOT_RE.match(name) for name in os.listdir(run_dir))
+        return sorted(int(m.group(1)) for m in found if m)
+
+    def runs(self):
+        """Run IDs with at least one snapshot."""
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isdir(self._run_dir(name)))
+
+    def read(self, run_id, generation):
+        """Memory-map a snapshot as stored (packed bytes or uint8 grid)."""
+        return np.load(self._snapshot_path(run_id, generation), mmap_mode="r")
+
+    def read_grid(self, run_id, generation):
+        """Return the grid saved for (run_id, generation).
+
+        Unpacked stores return a read-only memory-mapped view; packed
+        stores unpack into a new array with the original dtype.
+        """
+        meta = self._meta(run_id)
+        stored = self.read(run_id, generation)
+        if not meta['packed']:
+            return stored
+        cells = np.unpackbits(np.asarray(stored), axis=1, count=meta['cols'])
+        return cells.astype(np.dtype(meta['dtype']), copy=False)
+
+    def save_checkpoint(self, run_id, generation, grid, state):
+        """Snapshot grid and record a resumable checkpoint.
+
+        Args:
+            state (dict): JSON-serializable run state (parameters, records
+                so far, ...). Randomness is only used for the initial grid,
+                which the run's recorded seed regenerates, so no RNG state
+                is saved.
+        """
+        self.save(run_id, generation, grid)
+        payload = {key: to_builtin(value) for key, value in state.items()}
+        payload['generation'] = generation
+        _atomic_write_json(os.path.join(self._run_dir(run_id), "checkpoint.json"), payload)
+
+    def load_checkpoint(self, run_id):
+        """Load the latest checkpoint for a run.
+
+        Returns:
+            tuple: (grid, state) where state is the dict given to
+                   save_checkpoint plus 'generation'
+        """
+        with open(os.path.join(self._run_dir(run_id), "checkpoint.json")) as f:
+            state = json.load(f)
+        grid = np.array(self.read_grid(run_id, state['generation']))
+        return grid, state
@@ -0,0 +1,488 @@
+import argparse
+import asyncio
+import ipaddress
+import json
+import socket
+import struct
+import time
+from collections import deque
+import numpy as np
+from engines import get_engine
+from DataBase import to_builtin
+from game_of_life_core import generation_stats, initialize_grid, new_run_id
+from rules import get_rule
+from seeding import new_seed
+
+# Every message is HEADER (payload length, message type, generation)
+# followed by the payload
+HEADER = struct.Struct('>IBQ')
+
+# Message types. HELLO, STATS and END carry a JSON object; KEY carries the
+# grid as np.packbits of the flattened cells; DELTA carries the run-length
+# encoded XOR of the grid with the client's previous frame (see
+# encode_runs). A HELLO resets the client's grid to all dead, so the first
+# frame of a run can be a DELTA as well.
+HELLO, KEY, DELTA, STATS, END = b'HKDSE'
+
+DEFAULT_PORT = 8765
+
+
+def _varints(values):
+    """LEB128 encoding of non-negative integers (7 bits per byte, low first)."""
+    values = np.asarray(values, dtype=np.uint64)
+    if values.size == 0:
+        return b''
+    sizes = np.ones(values.size, dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    offsets = np.cumsum(sizes) - sizes
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for k in range(int(sizes.max())):
+        mask = sizes > k
+        byte = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = np.where(sizes[mask] > k + 1, 0x80, 0).astype(np.uint64)
+        out[offsets[mask] + k] = byte | more
+    return out.tobytes()
+
+
+def _read_varints(data):
+    """Inverse of _varints."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = np.arange(raw.size) - np.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7F).astype(np.uint64) << (7 * shifts).astype(np.uint64)
+    return np.add.reduceat(parts, starts).astype(np.int64)
+
+
+def encode_runs(cells):
+    """Run-length encode a flat 0/1 array.
+
+    The runs alternate dead, alive, dead, ... starting with a (possibly
+    empty) dead run, and are stored as varints. An XOR delta between two
+    generations has about two runs per changed cell, so its size grows
+    with the number of changes rather than the grid area.
+
+    Args:
+        cells (np.ndarray): 1-D array of 0s and 1s
+
+    Returns:
+        bytes
+    """
+    cells = np.asarray(cells, dtype=bool)
+    if cells.size == 0:
+        return b''
+    boundaries = np.flatnonzero(cells[1:] != cells[:-1]) + 1
+    lengths = np.diff(np.concatenate(([0], boundaries, [cells.size])))
+    if cells[0]:
+        lengths = np.concatenate(([0], lengths))
+    return _varints(lengths)
+
+
+def decode_runs(data, size):
+    """Inverse of encode_runs; returns a flat uint8 array of size cells.
+
+    Raises:
+        ValueError: If the runs don't add up to size
+    """
+    lengths = _read_varints(data)
+    if lengths.sum() != size:
+        raise ValueError(f"Run lengths cover {lengths.sum()} cells, expected {size}")
+    return np.repeat(np.arange(lengths.size, dtype=np.uint8) & 1, lengths)
+
+
+def encode_frame(grid, previous):
+    """Smallest encoding of grid for a client that holds previous.
+
+    Returns:
+        tuple: (DELTA, run-length encoded XOR) or (KEY, packed grid),
+               whichever is shorter
+    """
+    delta = encode_runs(np.not_equal(grid, previous).ravel())
+    packed = np.packbits(grid.astype(bool, copy=False).ravel())
+    if len(delta) < packed.size:
+        return DELTA, delta
+    return KEY, packed.tobytes()
+
+
+def decode_frame(message_type, payload, previous):
+    """Grid from a KEY or DELTA payload and the previous frame's grid."""
+    if message_type == KEY:
+        cells = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=previous.size)
+        return cells.reshape(previous.shape)
+    if message_type == DELTA:
+        return previous ^ decode_runs(payload, previous.size).reshape(previous.shape)
+    raise ValueError(f"Not a frame message: {chr(message_type)!r}")
+
+
+def _message(message_type, generation, payload):
+    if isinstance(payload, dict):
+        payload = json.dumps(payload).encode()
+    return HEADER.pack(len(payload), message_type, generation) + payload
+
+
+async def read_message(reader):
+    """Next (message type, generation, payload) from a stream.
+
+    JSON payloads (HELLO, STATS, END) are decoded to dicts.
+
+    Raises:
+        asyncio.IncompleteReadError: If the stream ends mid-message or
+            before one (check .partial for b'')
+    """
+    length, message_type, generation = HEADER.unpack(await reader.readexactly(HEADER.size))
+    payload = await reader.readexactly(length)
+    if message_type in (HELLO, STATS, END):
+        payload = json.loads(payload)
+    return message_type, generation, payload
+
+
+class _Client:
+    """One connection: the messages still to send and the last grid sent.
+
+    Messages are kept in order, but a frame waiting to be sent is replaced
+    by a newer one (counted in dropped_frames), so a slow client skips
+    generations instead of holding up the simulation or buffering
+    without bound. HELLO and END messages are never dropped.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.pending = deque()
+        self.ready = asyncio.Event()
+        self.grid = None
+        self.frames_sent = 0
+        self.dropped_frames = 0
+        self.bytes_sent = 0
+
+    def send(self, message_type, generation, payload):
+        self.pending.append(('message', message_type, generation, payload))
+        self.ready.set()
+
+    def offer(self, generation, grid, stats=None):
+        if self.pending and self.pending[-1][0] == 'frame':
+            old_stats = self.pending.pop()[3]
+            self.dropped_frames += 1
+            stats = stats if stats is not None else old_stats
+        self.pending.append(('frame', generation, grid, stats))
+        self.ready.set()
+
+    async def write_loop(self, server):
+        """Send pending messages until the connection is closed."""
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.pending:
+                item = self.pending.popleft()
+                if item[0] == 'message':
+                    _, message_type, generation, payload = item
+                    if message_type == HELLO:
+                        self.grid = np.zeros((payload['rows'], payload['cols']), dtype=np.uint8)
+                    data = _message(message_type, generation, payload)
+                else:
+                    _, generation, grid, stats = item
+                    message_type, payload = encode_frame(grid, self.grid)
+                    self.grid = grid
+                    self.frames_sent += 1
+                    data = _message(message_type, generation, payload)
+                    if stats is not None:
+                        data += _message(STATS, stats['generation'], server.live_stats(self, stats))
+                self.writer.write(data)
+                self.bytes_sent += len(data)
+                try:
+                    # Waits only while the socket buffer is over its
+                    # high-water mark; frames offered meanwhile replace
+                    # each other
+                    await self.writer.drain()
+                except ConnectionError:
+                    return
+
+
+class StreamServer:
+    """Run simulations and stream their generations to local TCP clients.
+
+    Each run starts with a HELLO message describing it (run_id, rows,
+    cols, prob_of_life, generations, rule, seed, engine). Then every
+    generation is offered to every client as a KEY or DELTA frame (see
+    encode_frame), followed every stats_interval generations by a STATS
+    message with generation_stats() plus live figures (generations per
+    second, connected clients, and this client's frames sent, frames
+    dropped and bytes sent). The run ends with an END message. Frames are
+    delta-encoded against what each client last received, so a client
+    that drops frames still decodes exactly.
+
+    Args:
+        rows, cols (int): Grid size
+        prob_of_life (float): Initial probability of life
+        generations (int): Generations per run
+        runs (int): Runs to stream back to back; 0 runs forever
+        rule (str): Life-like rule (see rules.get_rule); default B3/S23
+        engine (str): Stepping engine (see engines.get_engine)
+        seed (int): Root seed; each run's seed is spawned from it
+        fps (float): Most generations per second; 0 steps as fast as possible
+        stats_interval (int): Generations between STATS messages
+        wait_for (int): Clients to wait for before starting each run
+        host (str): Loopback address to bind (never a public interface)
+        port (int): TCP port; 0 picks a free one (see .port after start())
+        write_buffer (int): Bytes buffered per client (in the socket and
+            in the transport) before its frames start being dropped
+    """
+
+    def __init__(self, rows=100, cols=150, prob_of_life=0.1, generations=1000, runs=1,
+                 rule=None, engine=None, seed=None, fps=30.0, stats_interval=10, wait_for=0,
+                 host='127.0.0.1', port=DEFAULT_PORT, write_buffer=1 << 16):
+        if not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"Refusing to bind to {host}: the stream server is local only")
+        if stats_interval < 1:
+            raise ValueError("stats_interval must be at least 1")
+        self.rows, self.cols = rows, cols
+        self.prob_of_life = prob_of_life
+        self.generations = generations
+        self.runs = runs
+        self.rule = get_rule(rule).rulestring
+        self.engine = engine
+        self.step = get_engine(engine, rule)
+        self.seed = seed
+        self.fps = fps
+        self.stats_interval = stats_interval
+        self.wait_for = wait_for
+        self.host, self.port = host, port
+        self.write_buffer = write_buffer
+        self.clients = set()
+        self._client_joined = asyncio.Event()
+        self._server = None
+        self._hello = None
+        self._generations_per_second = 0.0
+
+    def live_stats(self, client, stats):
+        """A STATS payload for one client."""
+        return dict(stats, generations_per_second=round(self._generations_per_second, 2),
+                    clients=len(self.clients), frames_sent=client.frames_sent,
+                    dropped_frames=client.dropped_frames, bytes_sent=client.bytes_sent)
+
+    async def _handle(self, reader, writer):
+        # Keep the kernel from absorbing a slow client's backlog, so it
+        # shows up in drain() and the client's frames start being dropped
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+                                                   self.write_buffer)
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        client = _Client(writer)
+        if self._hello is not None:
+            client.send(HELLO, 0, self._hello)  # joined mid-run
+        self.clients.add(client)
+        self._client_joined.set()
+        sender = asyncio.create_task(client.write_loop(self))
+        try:
+            # Clients don't send anything; reading only notices them leaving
+            reader_done = asyncio.create_task(reader.read())
+            await asyncio.wait((sender, reader_done), return_when=asyncio.FIRST_COMPLETED)
+            reader_done.cancel()
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def start(self):
+        """Start accepting connections; returns once the port is bound."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        """Stop accepting connections and disconnect every client."""
+        if self._server is not None:
+            self._server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        while self.clients:
+            await asyncio.sleep(0.01)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def _wait_for_clients(self):
+        while len(self.clients) < self.wait_for:
+            self._client_joined.clear()
+            await self._client_joined.wait()
+
+    def _broadcast(self, message_type, generation, payload):
+        for client in list(self.clients):
+            client.send(message_type, generation, payload)
+
+    async def stream_run(self, seed):
+        """Simulate one run and stream it; returns its final stats."""
+        await self._wait_for_clients()
+        run_id = new_run_id()
+        grid = initialize_grid(self.rows, self.cols, self.prob_of_life, seed)
+        self._hello = {
+            'run_id': run_id, 'rows': self.rows, 'cols': self.cols,
+            'prob_of_life': self.prob_of_life, 'generations': self.generations,
+            'rule': self.rule, 'seed': seed, 'engine': self.engine,
+        }
+        self._broadcast(HELLO, 0, self._hello)
+        for client in list(self.clients):
+            client.offer(0, grid)
+
+        stats = None
+        started = time.perf_counter()
+        for generation in range(1, self.generations + 1):
+            # Step off the event loop so clients keep being served
+            new_grid = await asyncio.to_thread(self.step, grid)
+            elapsed = time.perf_counter() - started
+            self._generations_per_second = generation / elapsed if elapsed > 0 else 0.0
+            stats = None
+            if generation % self.stats_interval == 0 or generation == self.generations:
+                stats = {'generation': generation}
+                stats.update({key: to_builtin(value)
+                              for key, value in generation_stats(new_grid, grid).items()})
+            for client in list(self.clients):
+                client.offer(generation, new_grid, stats)
+            grid = new_grid
+            if self.fps:
+                await asyncio.sleep(max(generation / self.fps - elapsed, 0.0))
+            else:
+                await asyncio.sleep(0)
+
+        self._hello = None
+        self._broadcast(END, self.generations, {'run_id': run_id, 'seed': seed,
+                                                 'stats': stats})
+        return stats
+
+    async def serve(self):
+        """Stream runs (forever if runs is 0) to whoever is connected, then close."""
+        if self._server is None:
+            await self.start()
+        count = 0
+        while not self.runs or count < self.runs:
+            await self.stream_run(self._run_seed(count))
+            count += 1
+        # Let clients receive the last END before the server goes away
+        while any(client.pending or client.writer.transport.get_write_buffer_size()
+                  for client in self.clients):
+            await asyncio.sleep(0.01)
+        await self.close()
+
+    def _run_seed(self, index):
+        # The index-th of spawn_seeds(seed, ...), as batch_runs would draw
+        if self.seed is None:
+            return new_seed()
+        return new_seed(np.random.SeedSequence(self.seed, spawn_key=(index,)))
+
+
+async def watch(host='127.0.0.1', port=DEFAULT_PORT, runs=1, verify=False, on_message=None):
+    """Scripted client: connect, decode frames and collect what arrives.
+
+    Args:
+        runs (int): Disconnect after this many END messages; 0 never does
+        verify (bool): Recompute each run locally from its HELLO (seed,
+            rule, engine) and check every received frame against it
+        on_message (callable): Called as on_message(message_type,
+            generation, payload, grid) for every message, with the decoded
+            grid (None before the first HELLO)
+
+    Returns:
+        list: One dict per run with its 'hello', 'end', last 'stats',
+              number of 'frames' received and final 'grid'
+
+    Raises:
+        ValueError: If verify is set and a frame doesn't match
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    results = []
+    finished = 0
+    grid = expected = step = None
+    try:
+        while not runs or finished < runs:
+            message_type, generation, payload = await read_message(reader)
+            if message_type == HELLO:
+                grid = np.zeros((payload['rows'], payload['cols']), dtype=np.uint8)
+                current = {'hello': payload, 'stats': None, 'frames': 0}
+                results.append(current)
+                if verify:
+                    step = get_engine(payload['engine'], payload['rule'])
+                    expected = (0, initialize_grid(payload['rows'], payload['cols'],
+                                                   payload['prob_of_life'], payload['seed']))
+            elif message_type in (KEY, DELTA):
+                grid = decode_frame(message_type, payload, grid)
+                current['frames'] += 1
+                if verify:
+                    expected_generation, expected_grid = expected
+                    while expected_generation < generation:
+                        expected_generation, expected_grid = expected_generation + 1, step(expected_grid)
+                    expected = (expected_generation, expected_grid)
+                    if not np.array_equal(grid, expected_grid):
+                        raise ValueError(f"Frame {generation} doesn't match the simulation")
+            elif message_type == STATS:
+                current['stats'] = payload
+            elif message_type == END:
+                current['end'] = payload
+                current['grid'] = grid
+                finished += 1
+            if on_message is not None:
+                on_message(message_type, generation, payload, grid)
+    finally:
+        writer.close()
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Stream live Game of Life runs to local TCP clients, or watch a stream.")
+    parser.add_argument("--host", default="127.0.0.1", help="Loopback address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    serve = modes.add_parser("serve", help="Run simulations and stream them")
+    serve.add_argument("--rows", type=int, default=100)
+    serve.add_argument("--cols", type=int, default=150)
+    serve.add_argument("--prob", type=float, default=0.1, help="Probability of life")
+    serve.add_argument("--generations", type=int, default=1000)
+    serve.add_argument("--runs", type=int, default=0, help="Runs to stream; 0 runs forever")
+    serve.add_argument("--rule", help="Life-like rule, e.g. B36/S23 or highlife (default: B3/S23)")
+    serve.add_argument("--engine", help="Stepping engine (see engines.ENGINES)")
+    serve.add_argument("--seed", type=int, help="Root seed for reproducible runs")
+    serve.add_argument("--fps", type=float, default=30.0,
+                       help="Most generations per second; 0 for as fast as possible")
+    serve.add_argument("--stats-interval", type=int, default=10,
+                       help="Generations between stats messages")
+    serve.add_argument("--wait-for", type=int, default=1,
+                       help="Clients to wait for before starting each run")
+
+    client = modes.add_parser("watch", help="Connect and print the live stats")
+    client.add_argument("--runs", type=int, default=1, help="Runs to watch; 0 watches forever")
+    client.add_argument("--verify", action="store_true",
+                        help="Check every frame against a local recomputation")
+    return parser.parse_args()
+
+
+def _print_message(message_type, generation, payload, grid):
+    if message_type == HELLO:
+        print(f"Run {payload['run_id']}: {payload['rows']}x{payload['cols']} "
+              f"p={payload['prob_of_life']} {payload['rule']} seed={payload['seed']}")
+    elif message_type == STATS:
+        print(f"Generation {generation}: Density = {payload['density']:.2f}%, "
+              f"{payload['generations_per_second']:.1f} gen/s, "
+              f"dropped {payload['dropped_frames']}/{payload['frames_sent'] + payload['dropped_frames']} "
+              f"frames, {payload['bytes_sent']} bytes")
+    elif message_type == END:
+        print(f"Run {payload['run_id']} finished")
+
+
+async def _serve_and_announce(server):
+    await server.start()
+    print(f"Streaming on {server.host}:{server.port}")
+    await server.serve()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.mode == "serve":
+        server = StreamServer(args.rows, args.cols, args.prob, args.generations, args.runs,
+                              args.rule, args.engine, args.seed, args.fps, args.stats_interval,
+                              args.wait_for, args.host, args.port)
+        asyncio.run(_serve_and_announce(server))
+    else:
+        asyncio.run(watch(args.host, args.port, args.runs, args.verify, _print_message))
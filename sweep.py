@@ -0,0 +1,263 @@
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+from DataBase import parse_grid_size
+from game_of_life_core import new_run_id, run_simulation
+from Query_Density import get_final_density_stats
+from rules import get_rule
+from seeding import new_seed
+from sinks import SQLiteSink
+
+try:
+    from scipy import stats as scipy_stats
+except ImportError:  # SciPy is optional; without it intervals use the normal approximation
+    scipy_stats = None
+
+
+def critical_value(confidence, n):
+    """Two-sided critical value for a confidence interval on the mean of n runs.
+
+    Student's t with n - 1 degrees of freedom when SciPy is installed,
+    the normal quantile otherwise (slightly narrower for small n).
+    """
+    if scipy_stats is not None:
+        return float(scipy_stats.t.ppf((1 + confidence) / 2, n - 1))
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def interval_width(std, n, confidence=0.95):
+    """Full width of the confidence interval on a mean (None below 2 runs)."""
+    if n < 2 or std is None:
+        return None
+    return 2 * critical_value(confidence, n) * std / math.sqrt(n)
+
+
+def sweep_configs(probabilities, sizes, generations):
+    """Every (probability, rows, cols, generations) combination of a sweep.
+
+    Args:
+        probabilities (list): Probabilities of life
+        sizes (list): Grid sizes as 'ROWSxCOLS' strings
+        generations (list): Run lengths
+
+    Returns:
+        list: Configuration tuples, in sweep order
+    """
+    configs = []
+    for size in sizes:
+        rows, cols = parse_grid_size(size)
+        if rows is None:
+            raise ValueError(f"Invalid grid size '{size}' (expected ROWSxCOLS)")
+        for total in generations:
+            for prob in probabilities:
+                if not 0.0 <= prob <= 1.0:
+                    raise ValueError("Probabilities must be between 0.0 and 1.0")
+                configs.append((prob, rows, cols, total))
+    return configs
+
+
+def _key(config):
+    # Probabilities come back from SQLite as the same doubles, but don't
+    # rely on it
+    prob, rows, cols, total = config
+    return round(prob, 9), rows, cols, total
+
+
+def runs_needed(count, std, target_width, confidence=0.95, min_runs=5, max_runs=200,
+                batch=8):
+    """How many more runs a configuration gets this round.
+
+    Every configuration first gets min_runs runs. After that the number
+    of runs that would bring the interval below target_width is
+    estimated from the current standard deviation, and up to batch of
+    them are scheduled, so the estimate is refined between rounds.
+
+    Returns:
+        int: Runs to add (0 once converged or at max_runs)
+    """
+    if count >= max_runs:
+        return 0
+    if count < min_runs:
+        return min_runs - count
+    width = interval_width(std, count, confidence)
+    if width <= target_width:
+        return 0
+    estimate = math.ceil(count * (width / target_width) ** 2)
+    return min(max(estimate - count, 1), batch, max_runs - count)
+
+
+def plan_round(configs, target_width, confidence=0.95, min_runs=5, max_runs=200, batch=8,
+               rule=None):
+    """Current state of every configuration and the runs it needs next.
+
+    Completed runs already in the database count towards their
+    configuration, so finished configurations are skipped and an
+    interrupted sweep continues where it stopped.
+
+    Returns:
+        list: (config, stats, needed) tuples, where stats has the count,
+              mean, std and interval width of the final density
+    """
+    existing = {_key(config): stats for config, stats in get_final_density_stats(rule).items()}
+    plan = []
+    for config in configs:
+        stats = dict(existing.get(_key(config), {'count': 0, 'mean': None, 'std': None}))
+        stats['width'] = interval_width(stats['std'], stats['count'], confidence)
+        needed = runs_needed(stats['count'], stats['std'], target_width, confidence,
+                             min_runs, max_runs, batch)
+        plan.append((config, stats, needed))
+    return plan
+
+
+def _run_config(job):
+    """Worker entry point: one run of a configuration, streamed to the database."""
+    run_id, seed, (prob, rows, cols, total), log_interval, detect_cycles, rule = job
+    with SQLiteSink() as sink:
+        run_simulation(rows=rows, cols=cols, prob_of_life=prob, generations=total,
+                       log_interval=log_interval, run_id=run_id, detect_cycles=detect_cycles,
+                       sink=sink, rule=rule, seed=seed)
+    return run_id
+
+
+def _run_seed(seed, config, index):
+    """Seed of a configuration's index-th run.
+
+    With a root seed it depends only on the configuration and the run's
+    position in it, so a resumed sweep draws the same runs an
+    uninterrupted one would have.
+    """
+    if seed is None:
+        return new_seed()
+    prob, rows, cols, total = config
+    return new_seed(np.random.SeedSequence(
+        seed, spawn_key=(round(prob * 10**6), rows, cols, total, index)))
+
+
+def run_sweep(probabilities, sizes, generations, target_width=1.0, confidence=0.95,
+              min_runs=5, max_runs=200, batch=8, workers=1, seed=None, log_interval=100,
+              detect_cycles=False, rule=None):
+    """Sweep probability x grid size x generations until final densities converge.
+
+    Runs in rounds. Each round reads the final-density statistics of
+    every configuration from the database, gives each unconverged
+    configuration up to batch more runs (see runs_needed), and streams
+    them into the database. The sweep ends once every configuration's
+    confidence interval on the mean final density is narrower than
+    target_width or it has max_runs runs. The database is the only
+    state, so an interrupted sweep resumes by running it again.
+
+    Args:
+        probabilities (list): Probabilities of life
+        sizes (list): Grid sizes as 'ROWSxCOLS' strings
+        generations (list): Run lengths (multiples of log_interval)
+        target_width (float): Interval width to reach, in density percent
+        confidence (float): Confidence level of the interval
+        min_runs (int): Runs before the interval is trusted (at least 2)
+        max_runs (int): Cap per configuration
+        batch (int): Most runs added to one configuration per round
+        workers (int): Worker processes; 0 uses every core
+        seed (int): Root seed; None draws fresh entropy
+        log_interval (int): Generations between logged records
+        detect_cycles (bool): Stop runs early once they repeat
+        rule (str): Life-like rule to sweep (default B3/S23); only runs
+            of this rule count towards convergence
+
+    Returns:
+        list: The final plan_round() result
+    """
+    if min_runs < 2:
+        raise ValueError("min_runs must be at least 2")
+    if max_runs < min_runs:
+        raise ValueError("max_runs must be at least min_runs")
+    if batch < 1:
+        raise ValueError("batch must be at least 1")
+    if any(total % log_interval for total in generations):
+        raise ValueError("generations must be multiples of log_interval, "
+                         "so that the final generation is logged")
+    configs = sweep_configs(probabilities, sizes, generations)
+    rule = get_rule(rule).rulestring
+
+    executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count()) if workers != 1 else None
+    try:
+        round_num = 0
+        while True:
+            plan = plan_round(configs, target_width, confidence, min_runs, max_runs, batch,
+                              rule)
+            jobs = [
+                (new_run_id(), _run_seed(seed, config, stats['count'] + i), config,
+                 log_interval, detect_cycles, rule)
+                for i in range(max(needed for _, _, needed in plan))
+                for config, stats, needed in plan if i < needed
+            ]
+            if not jobs:
+                return plan
+            round_num += 1
+            pending = sum(1 for _, _, needed in plan if needed)
+            print(f"Round {round_num}: {len(jobs)} runs for {pending} of {len(configs)} configurations")
+            for _ in (executor.map(_run_config, jobs) if executor else map(_run_config, jobs)):
+                pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def print_plan(plan, target_width):
+    """Table of each configuration's runs, mean final density and interval width."""
+    print(f"{'probability':>11} {'size':>11} {'generations':>11} {'runs':>6} "
+          f"{'mean':>8} {'width':>8}  status")
+    for (prob, rows, cols, total), stats, needed in plan:
+        mean = f"{stats['mean']:.3f}" if stats['mean'] is not None else "-"
+        width = f"{stats['width']:.3f}" if stats['width'] is not None else "-"
+        if needed:
+            status = f"needs {needed} more"
+        elif stats['width'] is not None and stats['width'] <= target_width:
+            status = "converged"
+        else:
+            status = "run limit"
+        print(f"{prob:>11g} {f'{rows}x{cols}':>11} {total:>11} {stats['count']:>6} "
+              f"{mean:>8} {width:>8}  {status}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Sweep Game of Life configurations into $GAME_OF_LIFE_DB until the mean "
+                    "final density of each is known to a target precision. Rerun the same "
+                    "command to resume an interrupted sweep.")
+    parser.add_argument("--probs", type=float, nargs="+", required=True,
+                        help="Probabilities of life")
+    parser.add_argument("--sizes", nargs="+", default=["100x150"], help="Grid sizes (ROWSxCOLS)")
+    parser.add_argument("--generations", type=int, nargs="+", default=[1000])
+    parser.add_argument("--target-width", type=float, default=1.0,
+                        help="Confidence interval width to reach, in density percent")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--max-runs", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=8,
+                        help="Most runs added to a configuration per round")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; 0 uses every core (default: 1, serial)")
+    parser.add_argument("--seed", type=int, help="Root seed for reproducible sweeps")
+    parser.add_argument("--log-interval", type=int, default=100)
+    parser.add_argument("--detect-cycles", action="store_true",
+                        help="Stop runs early once they reach a fixed point or cycle")
+    parser.add_argument("--rule", help="Life-like rule, e.g. B36/S23 or highlife (default: B3/S23)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only show what the next round would run")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.dry_run:
+        plan = plan_round(sweep_configs(args.probs, args.sizes, args.generations),
+                          args.target_width, args.confidence, args.min_runs, args.max_runs,
+                          args.batch, args.rule)
+    else:
+        plan = run_sweep(args.probs, args.sizes, args.generations, args.target_width,
+                         args.confidence, args.min_runs, args.max_runs, args.batch,
+                         args.workers, args.seed, args.log_interval, args.detect_cycles,
+                         args.rule)
+    print_plan(plan, args.target_width)